@@ -0,0 +1,59 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from os import path
+from sys import argv, path as sys_path
+from tempfile import TemporaryDirectory
+from threading import Thread
+from time import perf_counter, sleep
+
+sys_path.insert(0, path.dirname(path.dirname(path.abspath(__file__))))
+
+import switch_cfw_dl
+from switch_cfw_dl import HTTPCache, LinkCache, resolve_download_links
+
+DETAIL_PAGE = b'''<html><body>
+<div class="download-box"><h4>Base</h4>
+<table class="bti-table"><tbody>
+<tr><th>Type</th><th>File</th><th>Links</th></tr>
+<tr><td>Base</td><td>Game [0100000000010000][v0].nsp</td><td><a href="https://mega.nz/file/abc">Mega</a></td></tr>
+</tbody></table></div>
+</body></html>'''
+LATENCY = 0.1
+GAME_COUNT = 64
+CONCURRENCY = [1, 2, 4, 8, 16]
+PER_HOST = 8
+
+class SlowHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        sleep(LATENCY)
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(DETAIL_PAGE)))
+        self.end_headers()
+        self.wfile.write(DETAIL_PAGE)
+
+    def log_message(self, format, *args):
+        pass
+
+def run(concurrency):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), SlowHandler)
+    Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    print(f"{GAME_COUNT} detail pages, {LATENCY * 1000:.0f} ms added latency, per-host limit {PER_HOST}")
+    print(f"{'workers':>8}{'seconds':>10}{'pages/s':>10}")
+    try:
+        for workers in concurrency:
+            with TemporaryDirectory() as cache_dir:
+                switch_cfw_dl.http_cache = HTTPCache(cache_dir, ttl=0)
+                switch_cfw_dl.link_cache = LinkCache(path.join(cache_dir, 'links.db'), ttl=0)
+                game_urls = [f"{base_url}/game/{workers}/{i}/" for i in range(GAME_COUNT)]
+                start = perf_counter()
+                resolved = sum(1 for _, links, error in resolve_download_links(game_urls, workers=workers, per_host=PER_HOST) if links and error is None)
+                elapsed = perf_counter() - start
+                switch_cfw_dl.http_cache.conn.close()
+                switch_cfw_dl.link_cache.conn.close()
+            print(f"{workers:>8}{elapsed:>10.2f}{resolved / elapsed:>10.1f}")
+    finally:
+        server.shutdown()
+
+if __name__ == "__main__":
+    run([int(workers) for workers in argv[1:]] or CONCURRENCY)
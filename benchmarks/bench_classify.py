@@ -0,0 +1,59 @@
+from json import load
+from os import path
+from sys import argv, exit, path as sys_path
+from time import perf_counter
+
+sys_path.insert(0, path.dirname(path.dirname(path.abspath(__file__))))
+
+from switch_cfw_dl import Classifier
+
+GOLDEN_FILE = path.join(path.dirname(path.abspath(__file__)), 'fixtures', 'classification_golden.json')
+
+def load_golden():
+    with open(GOLDEN_FILE, 'r', encoding='utf-8') as f:
+        return load(f)
+
+def check_golden(classifier, golden):
+    mismatches = 0
+    for filename, expected in golden['file_info']:
+        actual = classifier.parse_file_info(filename)
+        if actual != expected:
+            mismatches += 1
+            print(f"file_info mismatch for {filename!r}: {actual} != {expected}")
+    for game_name, region_text, expected in golden['regions']:
+        actual = classifier.extract_regions(game_name, region_text)
+        if actual != expected:
+            mismatches += 1
+            print(f"regions mismatch for {game_name!r}, {region_text!r}: {actual} != {expected}")
+    return mismatches
+
+def time_call(function, repeat):
+    best = None
+    for _ in range(repeat):
+        start = perf_counter()
+        function()
+        elapsed = perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def run(repeat=5):
+    golden = load_golden()
+    mismatches = check_golden(Classifier(), golden)
+    if mismatches:
+        print(f"{mismatches} classifications differ from {GOLDEN_FILE}")
+        return 1
+    filenames = [filename for filename, _ in golden['file_info']]
+    names = [(game_name, region_text) for game_name, region_text, _ in golden['regions']]
+    print(f"golden corpus OK ({len(filenames)} filenames, {len(names)} names)")
+    print(f"{'scenario':<28}{'filenames us':>14}{'names us':>10}")
+    for label, cache_size in (('cold (no memo)', 0), ('memoized', len(filenames) + len(names))):
+        classifier = Classifier(cache_size)
+        classifier.parse_file_infos(filenames)
+        classifier.extract_regions_batch(names)
+        files_time = time_call(lambda: classifier.parse_file_infos(filenames), repeat)
+        names_time = time_call(lambda: classifier.extract_regions_batch(names), repeat)
+        print(f"{label:<28}{files_time / len(filenames) * 1e6:>14.2f}{names_time / len(names) * 1e6:>10.2f}")
+    return 0
+
+if __name__ == "__main__":
+    exit(run(int(argv[1]) if len(argv) > 1 else 5))
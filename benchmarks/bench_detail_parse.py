@@ -0,0 +1,30 @@
+from glob import glob
+from os import path
+from sys import argv, path as sys_path
+from time import perf_counter
+
+sys_path.insert(0, path.dirname(path.dirname(path.abspath(__file__))))
+
+from switch_cfw_dl import parse_detail_page
+
+FIXTURES_DIR = path.join(path.dirname(path.abspath(__file__)), 'fixtures')
+
+def time_parse(function, html, repeat):
+    best = None
+    for _ in range(repeat):
+        start = perf_counter()
+        count = len(function(html))
+        elapsed = perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, count
+
+def run(repeat=20):
+    print(f"{'fixture':<28}{'KiB':>8}{'parse ms':>10}{'links':>7}")
+    for fixture in sorted(glob(path.join(FIXTURES_DIR, 'detail_*.html'))):
+        with open(fixture, 'r', encoding='utf-8') as f:
+            html = f.read()
+        elapsed, count = time_parse(parse_detail_page, html, repeat)
+        print(f"{path.basename(fixture):<28}{len(html) / 1024:>8.1f}{elapsed * 1000:>10.2f}{count:>7}")
+
+if __name__ == "__main__":
+    run(int(argv[1]) if len(argv) > 1 else 20)
@@ -0,0 +1,44 @@
+from os import cpu_count, path
+from random import Random
+from sys import argv, path as sys_path
+from time import perf_counter
+
+sys_path.insert(0, path.dirname(path.dirname(path.abspath(__file__))))
+
+from switch_cfw_dl import classify_parallel
+from synthetic import REGIONS, generate_games
+
+ROWS = 300_000
+CHUNK_SIZE = 5_000
+
+def generate_rows(count, seed=0):
+    rng = Random(seed)
+    names = []
+    filenames = []
+    for game in generate_games(count, seed):
+        region_text = rng.choice(REGIONS) if rng.random() < 0.2 else ''
+        names.append((game['name'], region_text))
+        filenames.append(f"{game['name']} [{game['code']}][v{rng.randint(0, 20) << 16}][{rng.choice(REGIONS)}].nsp")
+    return names, filenames
+
+def time_classification(method, items, workers):
+    start = perf_counter()
+    results = list(classify_parallel(method, items, workers, threshold=0, chunk_size=CHUNK_SIZE))
+    return perf_counter() - start, results
+
+def run(worker_counts, rows=ROWS):
+    names, filenames = generate_rows(rows)
+    print(f"{rows} rows, chunks of {CHUNK_SIZE}")
+    print(f"{'workers':>8}{'names s':>10}{'speedup':>9}{'files s':>10}{'speedup':>9}")
+    baseline = None
+    for workers in worker_counts:
+        names_time, names_result = time_classification('extract_regions_batch', names, workers)
+        files_time, files_result = time_classification('parse_file_infos', filenames, workers)
+        if baseline is None:
+            baseline = (names_time, files_time, names_result, files_result)
+        elif names_result != baseline[2] or files_result != baseline[3]:
+            raise AssertionError(f"results with {workers} workers differ from the sequential run")
+        print(f"{workers:>8}{names_time:>10.2f}{baseline[0] / names_time:>9.2f}{files_time:>10.2f}{baseline[1] / files_time:>9.2f}")
+
+if __name__ == "__main__":
+    run([int(workers) for workers in argv[1:]] or sorted({1, 2, 4, cpu_count() or 1}))
@@ -0,0 +1,53 @@
+from os import path
+from sys import argv, path as sys_path
+from tempfile import TemporaryDirectory
+from time import perf_counter
+
+sys_path.insert(0, path.dirname(path.dirname(path.abspath(__file__))))
+
+from switch_cfw_dl import SEARCH_LIMIT, build_games_db, fuzzy_search_games, search_game_by_name
+from synthetic import generate_games
+
+QUERIES = ['zelda', 'mario kart', 'pokemon legende', 'del', 'xenoblade chronicles definitive', 'nothing matches']
+FUZZY_QUERIES = ['zelda tears kingdom', 'zleda teers', 'xenoblad cronicles', 'hollow knigt', '- metroid dread (usa)', 'kngdom']
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+
+def legacy_search(conn, name_pattern, limit=SEARCH_LIMIT):
+    return conn.execute(
+        "SELECT name, link, code, region_mask FROM games WHERE name LIKE ? ORDER BY name LIMIT ?",
+        (f'%{name_pattern}%', limit or -1)
+    ).fetchall()
+
+def search_all(conn, name_pattern):
+    return search_game_by_name(conn, name_pattern, limit=0)
+
+def time_query(function, conn, query, repeat):
+    best = None
+    for _ in range(repeat):
+        start = perf_counter()
+        count = len(function(conn, query))
+        elapsed = perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, count
+
+def run(sizes, repeat=5):
+    with TemporaryDirectory() as temp_dir:
+        for size in sizes:
+            db_file = path.join(temp_dir, f'games_{size}.db')
+            start = perf_counter()
+            conn = build_games_db(generate_games(size), db_file, path.join(temp_dir, 'missing.json'))
+            print(f"\n{size} titles (build {perf_counter() - start:.2f}s)")
+            print(f"{'query':<34}{f'top-{SEARCH_LIMIT} ms':>12}{'hits':>8}{'LIKE ms':>12}{'hits':>8}{'all ms':>12}{'hits':>8}")
+            for query in QUERIES:
+                indexed, indexed_hits = time_query(search_game_by_name, conn, query, repeat)
+                legacy, legacy_hits = time_query(legacy_search, conn, query, repeat)
+                unlimited, unlimited_hits = time_query(search_all, conn, query, repeat)
+                print(f"{query:<34}{indexed * 1000:>12.2f}{indexed_hits:>8}{legacy * 1000:>12.2f}{legacy_hits:>8}{unlimited * 1000:>12.2f}{unlimited_hits:>8}")
+            print(f"{'fuzzy query':<34}{'top-20 ms':>12}{'hits':>8}")
+            for query in FUZZY_QUERIES:
+                fuzzy, fuzzy_hits = time_query(fuzzy_search_games, conn, query, repeat)
+                print(f"{query:<34}{fuzzy * 1000:>12.2f}{fuzzy_hits:>8}")
+            conn.close()
+
+if __name__ == "__main__":
+    run([int(size) for size in argv[1:]] or DEFAULT_SIZES)
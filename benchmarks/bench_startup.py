@@ -0,0 +1,87 @@
+from argparse import ArgumentParser
+from os import path
+from subprocess import DEVNULL, PIPE, run as run_process
+from sys import executable, path as sys_path
+from tempfile import TemporaryDirectory
+from time import perf_counter
+
+ROOT_DIR = path.dirname(path.dirname(path.abspath(__file__)))
+sys_path.insert(0, ROOT_DIR)
+
+from switch_cfw_dl import CATALOG_FILE, JSON_FILE, Catalog, export_catalog_json, write_catalog
+from synthetic import generate_games
+
+SCRIPT = path.join(ROOT_DIR, 'switch_cfw_dl.py')
+BINARY_NAMES = ['switch_cfw_dl.bin', 'switch_cfw_dl.exe']
+CATALOG_SIZE = 20_000
+COMMANDS = [
+    ('help', ['--help']),
+    ('search', ['search', 'zelda']),
+]
+TOP_IMPORTS = 15
+
+def prepare_catalog(work_dir, size=CATALOG_SIZE):
+    catalog_file = path.join(work_dir, CATALOG_FILE)
+    write_catalog(generate_games(size), catalog_file)
+    with Catalog(catalog_file) as catalog:
+        export_catalog_json(catalog, path.join(work_dir, JSON_FILE))
+    run_process([executable, SCRIPT, 'search', 'warm'], cwd=work_dir, stdout=DEVNULL, check=True)
+
+def find_binary():
+    for name in BINARY_NAMES:
+        binary = path.join(ROOT_DIR, name)
+        if path.exists(binary):
+            return binary
+    return None
+
+def time_command(command, work_dir, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = perf_counter()
+        run_process(command, cwd=work_dir, stdout=DEVNULL, stderr=DEVNULL, check=True)
+        timings.append(perf_counter() - start)
+    return min(timings), sum(timings) / len(timings)
+
+def import_times(arguments, work_dir):
+    result = run_process([executable, '-X', 'importtime', SCRIPT] + arguments, cwd=work_dir, stdout=DEVNULL, stderr=PIPE, text=True)
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        if not name.startswith('  '):
+            modules.append((int(cumulative), name.strip()))
+    return sorted(modules, reverse=True)
+
+def run(repeat, binary, top):
+    with TemporaryDirectory() as work_dir:
+        prepare_catalog(work_dir)
+        targets = [('python', [executable, SCRIPT])]
+        if binary:
+            targets.append(('binary', [binary]))
+        print(f"{'target':<10}{'command':<10}{'best ms':>12}{'mean ms':>12}")
+        baseline = time_command([executable, '-c', 'pass'], work_dir, repeat)
+        print(f"{'python':<10}{'(empty)':<10}{baseline[0] * 1000:>12.1f}{baseline[1] * 1000:>12.1f}")
+        for target, command in targets:
+            for label, arguments in COMMANDS:
+                best, mean = time_command(command + arguments, work_dir, repeat)
+                print(f"{target:<10}{label:<10}{best * 1000:>12.1f}{mean * 1000:>12.1f}")
+        if not binary:
+            print("No built binary found, run build.sh to include it.")
+        for label, arguments in COMMANDS:
+            modules = import_times(arguments, work_dir)
+            total = sum(cumulative for cumulative, _ in modules)
+            print(f"\nImports for '{label}': {len(modules)} top-level modules, {total / 1000:.1f} ms")
+            for cumulative, name in modules[:top]:
+                print(f"{name:<32}{cumulative / 1000:>10.2f} ms")
+
+def main():
+    parser = ArgumentParser(description="Measure cold-start time of the script and the built binary.")
+    parser.add_argument('--repeat', type=int, default=10, help="timed runs per command")
+    parser.add_argument('--binary', default=find_binary(), help="path to the Nuitka binary")
+    parser.add_argument('--top', type=int, default=TOP_IMPORTS, help="slowest imports to list")
+    args = parser.parse_args()
+    run(args.repeat, args.binary, args.top)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+from argparse import ArgumentParser
+from datetime import datetime, timezone
+from glob import glob
+from io import BytesIO
+from json import dump, load
+from os import makedirs, path
+from platform import platform, python_version
+from subprocess import DEVNULL, run as run_process
+from sys import executable, exit, path as sys_path
+from tempfile import TemporaryDirectory
+from time import perf_counter
+
+BENCHMARKS_DIR = path.dirname(path.abspath(__file__))
+sys_path.insert(0, path.dirname(BENCHMARKS_DIR))
+
+from switch_cfw_dl import (
+    Catalog, Classifier, build_games_db, fuzzy_search_games, iter_games_from_stream, load_games_to_db,
+    lookup_codes, parse_detail_page, search_game_by_name, write_catalog
+)
+from bench_startup import COMMANDS as STARTUP_COMMANDS, SCRIPT, prepare_catalog
+from synthetic import generate_detail_page, generate_games, generate_index_page
+
+FIXTURES_DIR = path.join(BENCHMARKS_DIR, 'fixtures')
+DEFAULT_SIZES = [1_000, 10_000, 100_000]
+SEARCH_QUERIES = ['zelda', 'mario kart', 'pokemon legende', 'del', 'nothing matches']
+FUZZY_QUERIES = ['zelda tears kingdom', 'zleda teers', 'xenoblad cronicles', 'hollow knigt']
+REGRESSION_THRESHOLD = 0.10
+
+def measure(function, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = perf_counter()
+        function()
+        timings.append(perf_counter() - start)
+    return min(timings), sum(timings) / len(timings)
+
+def read_fixture(name, mode='r'):
+    with open(path.join(FIXTURES_DIR, name), mode, **({} if 'b' in mode else {'encoding': 'utf-8'})) as f:
+        return f.read()
+
+def index_parse_scenarios(sizes):
+    pages = [('fixture', read_fixture('index_sample.html', 'rb'))]
+    pages += [(size, generate_index_page(size).encode('utf-8')) for size in sizes]
+    for size, page in pages:
+        yield 'index_parse', size, lambda page=page: sum(1 for _ in iter_games_from_stream(BytesIO(page)))
+
+def detail_parse_scenarios(sizes):
+    for fixture in sorted(glob(path.join(FIXTURES_DIR, 'detail_*.html'))):
+        html = read_fixture(fixture)
+        yield 'detail_parse', path.basename(fixture), lambda html=html: parse_detail_page(html)
+    for rows in (10, 100, 1000):
+        html = generate_detail_page(rows)
+        yield 'detail_parse', rows, lambda html=html: parse_detail_page(html)
+
+def catalog_scenarios(sizes, temp_dir):
+    for size in sizes:
+        games = list(generate_games(size))
+        catalog_file = path.join(temp_dir, f'catalog_{size}.bin')
+        db_file = path.join(temp_dir, f'catalog_{size}.db')
+        yield 'catalog_write', size, lambda games=games, catalog_file=catalog_file: write_catalog(games, catalog_file)
+
+        def build(catalog_file=catalog_file, db_file=db_file):
+            with Catalog(catalog_file) as catalog:
+                build_games_db(catalog, db_file, catalog_file).close()
+
+        yield 'db_build', size, build
+        yield 'db_open', size, lambda catalog_file=catalog_file, db_file=db_file: load_games_to_db(db_file, catalog_file).close()
+
+        def search(catalog_file=catalog_file, db_file=db_file):
+            conn = load_games_to_db(db_file, catalog_file)
+            for query in SEARCH_QUERIES:
+                search_game_by_name(conn, query)
+            conn.close()
+
+        yield 'search', size, search
+
+        def fuzzy_search(catalog_file=catalog_file, db_file=db_file):
+            conn = load_games_to_db(db_file, catalog_file)
+            for query in FUZZY_QUERIES:
+                fuzzy_search_games(conn, query)
+            conn.close()
+
+        yield 'fuzzy_search', size, fuzzy_search
+
+        def code_lookup(catalog_file=catalog_file, db_file=db_file, codes=[game['code'] for game in games[::10]]):
+            conn = load_games_to_db(db_file, catalog_file)
+            lookup_codes(conn, codes)
+            conn.close()
+
+        yield 'code_lookup', size, code_lookup
+
+def classification_scenarios():
+    with open(path.join(FIXTURES_DIR, 'classification_golden.json'), 'r', encoding='utf-8') as f:
+        golden = load(f)
+    filenames = [filename for filename, _ in golden['file_info']]
+    names = [(game_name, region_text) for game_name, region_text, _ in golden['regions']]
+    cold = Classifier(0)
+    warm = Classifier()
+    yield 'classify_files', 'cold', lambda: cold.parse_file_infos(filenames)
+    yield 'classify_files', 'memoized', lambda: warm.parse_file_infos(filenames)
+    yield 'classify_names', 'cold', lambda: cold.extract_regions_batch(names)
+    yield 'classify_names', 'memoized', lambda: warm.extract_regions_batch(names)
+
+def startup_scenarios(temp_dir):
+    work_dir = path.join(temp_dir, 'startup')
+    makedirs(work_dir)
+    prepare_catalog(work_dir)
+    for label, arguments in STARTUP_COMMANDS:
+        command = [executable, SCRIPT] + arguments
+        yield 'startup', label, lambda command=command: run_process(command, cwd=work_dir, stdout=DEVNULL, check=True)
+
+def current_commit():
+    try:
+        result = run_process(['git', 'rev-parse', '--short', 'HEAD'], cwd=BENCHMARKS_DIR, capture_output=True, text=True)
+    except OSError:
+        return None
+    return result.stdout.strip() or None
+
+def run_scenarios(scenarios, repeat, selected):
+    results = []
+    for scenario, size, function in scenarios:
+        if selected and scenario not in selected:
+            continue
+        function()
+        best, mean = measure(function, repeat)
+        results.append({'scenario': scenario, 'size': size, 'best': best, 'mean': mean, 'repeat': repeat})
+        print(f"{scenario:<16}{str(size):<26}{best * 1000:>12.3f} ms{mean * 1000:>12.3f} ms")
+    return results
+
+def compare(results, baseline_file, threshold):
+    with open(baseline_file, 'r', encoding='utf-8') as f:
+        baseline = {(result['scenario'], str(result['size'])): result['best'] for result in load(f)['results']}
+    regressions = 0
+    print(f"\nCompared with {baseline_file}:")
+    for result in results:
+        previous = baseline.get((result['scenario'], str(result['size'])))
+        if not previous:
+            continue
+        ratio = result['best'] / previous
+        flag = ''
+        if ratio > 1 + threshold:
+            flag = '  REGRESSION'
+            regressions += 1
+        print(f"{result['scenario']:<16}{str(result['size']):<26}{ratio:>8.2f}x{flag}")
+    return regressions
+
+def main():
+    parser = ArgumentParser(description="Run the offline benchmark suite.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES, help="synthetic catalog sizes")
+    parser.add_argument('--repeat', type=int, default=5, help="timed runs per scenario")
+    parser.add_argument('--scenario', action='append', default=[], help="only run this scenario (repeatable)")
+    parser.add_argument('--output', help="write results as JSON to this file")
+    parser.add_argument('--compare', help="compare against a previous JSON results file")
+    parser.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD, help="relative slowdown reported as a regression")
+    args = parser.parse_args()
+    print(f"{'scenario':<16}{'size':<26}{'best':>15}{'mean':>15}")
+    with TemporaryDirectory() as temp_dir:
+        results = []
+        for scenarios in (
+            index_parse_scenarios(args.sizes),
+            detail_parse_scenarios(args.sizes),
+            catalog_scenarios(args.sizes, temp_dir),
+            classification_scenarios(),
+            startup_scenarios(temp_dir),
+        ):
+            results += run_scenarios(scenarios, args.repeat, args.scenario)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            dump({
+                'commit': current_commit(),
+                'timestamp': datetime.now(timezone.utc).isoformat(),
+                'python': python_version(),
+                'platform': platform(),
+                'repeat': args.repeat,
+                'results': results,
+            }, f, indent=2)
+    if args.compare:
+        return 1 if compare(results, args.compare, args.threshold) else 0
+    return 0
+
+if __name__ == "__main__":
+    exit(main())
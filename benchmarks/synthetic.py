@@ -0,0 +1,78 @@
+from base64 import b64encode
+from html import escape
+from random import Random
+
+WORDS = [
+    'zelda', 'mario', 'kart', 'pokémon', 'légende', 'tears', 'kingdom', 'breath', 'wild',
+    'metroid', 'dread', 'kirby', 'forgotten', 'land', 'xenoblade', 'chronicles', 'splatoon',
+    'animal', 'crossing', 'fire', 'emblem', 'engage', 'bayonetta', 'donkey', 'kong', 'tropical',
+    'freeze', 'smash', 'bros', 'ultimate', 'party', 'superstars', 'odyssey', 'wonder', 'pikmin',
+    'octopath', 'traveler', 'astral', 'chain', 'luigi', 'mansion', 'hollow', 'knight', 'celeste',
+    'hadès', 'stardew', 'valley', 'deluxe', 'edition', 'definitive', 'remastered', 'collection',
+]
+REGIONS = ['US', 'EU', 'JP', 'ASIA', 'USA']
+HOSTS = ['Mega', '1Fichier', 'Google Drive', 'Buzzheavier', 'Pixeldrain', 'SendCM', 'MediaFire', 'Uptobox']
+CATEGORIES = ['Base', 'Update', 'Old Update', 'DLC']
+
+def generate_name(rng):
+    words = rng.sample(WORDS, rng.randint(2, 5))
+    name = ' '.join(word.capitalize() for word in words)
+    if rng.random() < 0.3:
+        name += f" ({rng.choice(REGIONS)})"
+    return name
+
+def generate_code(i):
+    return f"{0x0100000000000000 + i * 0x2000:016X}"
+
+def generate_games(count, seed=0):
+    rng = Random(seed)
+    for i in range(count):
+        yield {
+            'name': generate_name(rng),
+            'link': f"https://nswdl.com/{i}/",
+            'code': generate_code(i),
+            'regions': ['All', 'US'],
+        }
+
+def generate_index_page(count, seed=0):
+    rng = Random(seed)
+    parts = [
+        '<!DOCTYPE html><html lang="en-US"><head><meta charset="UTF-8"><title>Switch Posts – NSW2U</title></head>',
+        '<body><div id="content"><table class="table"><tbody>',
+    ]
+    for i in range(count):
+        name = escape(generate_name(rng))
+        prefix = rng.choice(['', '- ', '– '])
+        region = f' <span style="color: red;">{rng.choice(REGIONS)}</span>' if rng.random() < 0.2 else ''
+        parts.append(
+            f'<tr class="post-row"><td><a href="/{i}-{name.lower().replace(" ", "-")}/">{prefix}{name}</a>{region}</td>'
+            f'<td>{generate_code(i)}</td></tr>'
+        )
+        if i % 500 == 499:
+            parts.append('<tr class="post-row"><td><a href="#top">(Back to Top)</a></td><td></td></tr>')
+    parts.append('</tbody></table></div></body></html>')
+    return ''.join(parts)
+
+def redirect_link(url):
+    return 'https://nswdl.com/redirect-to/?url=' + b64encode(url.encode('utf-8')).decode('ascii').rstrip('=')
+
+def generate_detail_page(rows, mirrors=len(HOSTS), seed=0):
+    rng = Random(seed)
+    title = generate_name(rng)
+    parts = [
+        f'<!DOCTYPE html><html lang="en-US"><head><meta charset="UTF-8"><title>{escape(title)} – NSW2U</title></head>',
+        f'<body><article><h1 class="entry-title">{escape(title)}</h1><div class="entry-content"><div class="download-box">',
+    ]
+    for section in range(0, rows, 20):
+        parts.append(f'<h4>Section {section // 20 + 1}</h4><table class="bti-table"><thead><tr><th>Type</th><th>File</th><th>Links</th></tr></thead><tbody>')
+        for row in range(section, min(section + 20, rows)):
+            category = rng.choice(CATEGORIES)
+            filename = f"{title} [{generate_code(row)}][v{rng.randint(0, 8) * 65536}].nsp"
+            links = ' | '.join(
+                f'<a href="{redirect_link(f"https://host{mirror}.example/{row}")}" target="_blank">{HOSTS[mirror % len(HOSTS)]}</a>'
+                for mirror in range(mirrors)
+            )
+            parts.append(f'<tr><td>{category}</td><td><strong>{escape(filename)}</strong></td><td>{links}</td></tr>')
+        parts.append('</tbody></table>')
+    parts.append('</div></div></article></body></html>')
+    return ''.join(parts)
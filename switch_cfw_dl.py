@@ -1,331 +1,1730 @@
-from base64 import b64decode
-from html.parser import HTMLParser
-from json import dump, load, dumps, loads
-from os import path, remove
-from re import sub, search, IGNORECASE, findall, compile, DOTALL
-from sqlite3 import connect
-from urllib.request import Request, urlopen
-from urllib.parse import urlparse, parse_qs
+from array import array
+from argparse import ArgumentParser
+from codecs import getincrementaldecoder
+from collections import deque
+from contextlib import nullcontext
+from functools import lru_cache
+from heapq import heappop, heappush
+from itertools import chain, islice
+from json import load, loads, dumps
+from mmap import mmap, ACCESS_READ
+from os import close, cpu_count, makedirs, path, remove, replace, stat
+from re import sub, search, IGNORECASE, compile, escape
+from struct import Struct
+from sys import byteorder, exit, stderr, stdin
+from threading import BoundedSemaphore, Event, Lock, Thread, local
+from time import perf_counter, sleep, time
 
-from unicodedata import normalize, combining
+from zlib import MAX_WBITS, decompressobj, error as ZlibError
 
 JSON_FILE = 'games.json'
 US_JSON_FILE = 'games_us.json'
+DB_FILE = 'games.db'
+DB_SCHEMA_VERSION = 7
+DB_LOCK_TIMEOUT = 60
+CATALOG_FILE = 'games.bin'
+CATALOG_MAGIC = b'SCFWCAT\0'
+CATALOG_VERSION = 1
+CATALOG_HEADER = Struct('<8sII9Q')
+REGION_CODES = ('All', 'US', 'EU', 'JP', 'UK', 'AS', 'CH', 'KOR', 'TW', 'FR', 'DE', 'IT', 'ES', 'Unknown')
+REGION_BITS = {region: 1 << i for i, region in enumerate(REGION_CODES)}
+US_REGION_MASK = REGION_BITS['US'] | REGION_BITS['All']
+DB_BATCH_SIZE = 1000
+SEARCH_LIMIT = 100
+TITLE_ID_PATTERN = r'[0-9A-Fa-f]{16}'
+TITLE_BASE_MASK = 0x1FFF
+TITLE_UPDATE_OFFSET = 0x800
+TITLE_DLC_OFFSET = 0x1000
+FUZZY_GRAM_SIZE = 3
+FUZZY_LIMIT = 20
+FUZZY_CANDIDATES = 500
+FUZZY_STRIP_PATTERN = r'^\s*[-–]\s+|[\[(][^\])]*[\])]'
+FUZZY_TOKEN_PATTERN = r'\w+'
+INDEX_URL = "https://nsw2u.com/switch-posts"
+STREAM_CHUNK_SIZE = 64 * 1024
+CACHE_DIR = 'http_cache'
+CACHE_TTL = 60 * 60
+CACHE_MAX_SIZE = 256 * 1024 * 1024
+LINK_CACHE_FILE = path.join(CACHE_DIR, 'links.db')
+LINK_CACHE_TTL = 6 * 60 * 60
+LINK_CACHE_MAX_SIZE = 32 * 1024 * 1024
+REQUEST_TIMEOUT = 30
+BATCH_WORKERS = 8
+BATCH_PER_HOST = 4
+BATCH_RETRIES = 3
+BATCH_BACKOFF = 0.5
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+DEFAULT_HEADERS = {'User-Agent': USER_AGENT, 'Accept-Encoding': 'gzip, deflate'}
+MAX_REDIRECTS = 5
+REDIRECT_STATUSES = (301, 302, 303, 307, 308)
+SERVE_HOST = '127.0.0.1'
+SERVE_PORT = 8750
+SERVE_RELOAD_INTERVAL = 2.0
+LATENCY_WINDOW = 10000
+DOWNLOAD_SECTION_TAGS = ('div', 'table')
+DOWNLOAD_IDENTIFIERS = (
+    'download', 'téléchargement', 'descargar', 'herunterladen',
+    'scarica', 'baixar', 'скачать', '下载', 'ダウンロード'
+)
+DOWNLOAD_DOMAINS = (
+    'mega.nz', 'mediafire', 'drive.google', 'dropbox', '1fichier',
+    'uploadhaven', 'zippyshare', 'uptobox', 'google.com', 'pixeldrain',
+    'up-4ever', 'file-upload', 'sendcm', 'send.cm', 'clicknupload', 'frdl.is',
+    'buzzheavier', 'ouo.io', 'redirect-to'
+)
+CLASSIFIER_CACHE_SIZE = 65536
+CLASSIFY_WORKERS = cpu_count() or 1
+CLASSIFY_PARALLEL_THRESHOLD = 50_000
+CLASSIFY_CHUNK_SIZE = 5_000
+VERSION_PATTERNS = [
+    r'\[v(?P<v0>\d+\.?\d*(?:\.\d+)*)\]',  # [v1.2.3]
+    r'\(v(?P<v1>\d+\.?\d*(?:\.\d+)*)\)',  # (v1.2.3)
+    r'v(?P<v2>\d+\.?\d*(?:\.\d+)*)',       # v1.2.3
+    r'\[(?P<v3>\d+\.?\d+(?:\.\d+)*)\]',   # [1.2.3]
+    r'\((?P<v4>\d+\.?\d+(?:\.\d+)*)\)',   # (1.2.3)
+    r'\[v?(?P<v5>\d+)\]',                 # [65536] or [v65536]
+    r'\bv(?P<v6>\d+\.?\d*(?:\.\d+)*)\b',  # v1.2.3 (with word boundary)
+]
+FILE_REGION_PATTERNS = {
+    'US': r'\[US\]|\(US\)|USA',
+    'EU': r'\[EU\]|\(EU\)|EUR|Europe',
+    'JP': r'\[JP\]|\(JP\)|JPN|Japan',
+    'AS': r'\[AS\]|\(AS\)|ASIA',
+    'ALL': r'\[ALL\]|\(ALL\)|WW|World',
+    'KOR': r'\[KOR\]|\(KOR\)|Korea',
+    'CHN': r'\[CHN\]|\(CHN\)|China',
+}
+FILE_INFO_PATTERN = r'(?=[\[(vUuEeJjAaWwKkCc])(?=' + '|'.join(
+    VERSION_PATTERNS + [f'(?i:(?P<r_{region}>{pattern}))' for region, pattern in FILE_REGION_PATTERNS.items()]
+) + ')'
+NAME_REGION_PATTERN = r'\b(JP|US|USA|EU|UK|AS|CH|KOR|TW|FR|DE|IT|ES|Asia|Japan|America|Europe|England|China|Korea|Taiwan|France|Germany|Italy|Spain)\b'
+NAME_REGION_MAP = {
+    'japan': 'JP', 'jp': 'JP',
+    'us': 'US', 'usa': 'US', 'america': 'US',
+    'eu': 'EU', 'europe': 'EU',
+    'uk': 'UK', 'england': 'UK',
+    'as': 'AS', 'asia': 'AS',
+    'ch': 'CH', 'china': 'CH', 'chinese': 'CH',
+    'kor': 'KOR', 'korea': 'KOR', 'korean': 'KOR', 'ko': 'KOR',
+    'tw': 'TW', 'taiwan': 'TW',
+    'fr': 'FR', 'france': 'FR', 'french': 'FR',
+    'de': 'DE', 'germany': 'DE', 'german': 'DE',
+    'it': 'IT', 'italy': 'IT', 'italian': 'IT',
+    'es': 'ES', 'spain': 'ES', 'spanish': 'ES', 'spa': 'ES'
+}
+DOWNLOAD_DOMAIN_PATTERN = '|'.join(escape(domain) for domain in DOWNLOAD_DOMAINS)
+FILE_LINK_PATTERN = r'href=[\'"]?([^\'" >]+\.(?:nsp|xci|rar|zip)[^\'" >]*)'
+REDIRECT_LINK_PATTERN = r'href=[\'"]?([^\'" >]*redirect-to[^\'" >]*)'
+
+@lru_cache(maxsize=None)
+def compiled(pattern, flags=0):
+    return compile(pattern, flags)
 
-class GameParser(HTMLParser):
-    def __init__(self):
-        super().__init__()
-        self.in_game_row = False
-        self.in_game_cell = False
-        self.current_link = None
-        self.games = []
-        self.current_game = {}
-        self.parsing_link = False
-        self.region_text = ""
-        self.parsing_region = False
-
-    def handle_starttag(self, tag, attrs):
-        if tag == 'tr' and ('class', 'post-row') in attrs:
-            self.in_game_row = True
-            self.current_game = {}
-            self.region_text = ""
-        elif self.in_game_row and tag == 'td':
-            self.in_game_cell = True
-        elif self.in_game_cell and tag == 'a':
-            self.parsing_link = True
-            for attr in attrs:
-                if attr[0] == 'href':
-                    link = attr[1]
-                    if not link.startswith(('http://', 'https://')):
-                        link = f"https://nswdl.com{'' if link.startswith('/') else '/'}{link}"
-                    self.current_game['link'] = link
-                    break
-        elif tag == 'span' and self.in_game_cell and any(attr[0] == 'style' and 'color: red' in attr[1] for attr in attrs):
-            self.parsing_region = True
 
-    def handle_endtag(self, tag):
-        if tag == 'tr' and self.in_game_row:
+@lru_cache(maxsize=None)
+def html_parser_classes():
+    from html.parser import HTMLParser
+
+    class GameParser(HTMLParser):
+        def __init__(self):
+            super().__init__()
             self.in_game_row = False
-            if self.current_game and 'name' in self.current_game and 'link' in self.current_game:
-                if 'code' not in self.current_game:
-                    self.current_game['code'] = "Unknown"
-                if self.current_game.get('name') == '(Back to Top)':
-                    return
-                if self.current_game.get('name', '').startswith('- '):
-                    self.current_game['name'] = self.current_game['name'][2:]
-                elif self.current_game.get('name', '').startswith('– '):
-                    self.current_game['name'] = self.current_game['name'][2:]
-                self.current_game['regions'] = extract_regions_from_name(self.current_game.get('name', ''), self.region_text)
-                self.games.append(self.current_game)
-        elif tag == 'td' and self.in_game_cell:
             self.in_game_cell = False
-        elif tag == 'a' and self.parsing_link:
+            self.current_link = None
+            self.games = []
+            self.current_game = {}
             self.parsing_link = False
-        elif tag == 'span' and self.parsing_region:
+            self.region_text = ""
             self.parsing_region = False
+            self.pending_data = []
 
-    def handle_data(self, data):
-        if self.parsing_link:
-            clean_data = sub(r'<[^>]*>', '', data).strip()
-            if clean_data:
-                if 'name' not in self.current_game:
-                    self.current_game['name'] = clean_data
-        elif self.parsing_region:
-            self.region_text += " " + data
-        elif self.in_game_cell:
-            if 'code' not in self.current_game:
-                code_match = search(r'([0-9A-F]{16})', data)
-                if code_match:
-                    self.current_game['code'] = code_match.group(1)
-
-class DownloadLinkParser(HTMLParser):
-    def __init__(self):
-        super().__init__()
-        self.download_links = []
-        self.in_download_section = False
-        self.parsing_link = False
-        self.current_link = ""
-        self.current_text = ""
-        self.download_section_tags = ['div', 'table']
-        self.download_identifiers = [
-            'download', 'téléchargement', 'descargar', 'herunterladen', 
-            'scarica', 'baixar', 'скачать', '下载', 'ダウンロード'
-        ]
-
-    def handle_starttag(self, tag, attrs):
-        if tag in self.download_section_tags:
-            class_attr = next((attr[1] for attr in attrs if attr[0] == 'class'), '')
-            id_attr = next((attr[1] for attr in attrs if attr[0] == 'id'), '')
-            if any(dl_id.lower() in class_attr.lower() or dl_id.lower() in id_attr.lower() 
-                  for dl_id in self.download_identifiers):
-                self.in_download_section = True
-        elif tag == 'tr' and self.in_download_section:
-            self.in_download_section = True
-        elif self.in_download_section and tag == 'a':
-            self.parsing_link = True
-            for attr in attrs:
-                if attr[0] == 'href':
-                    href = attr[1]
-                    if any(domain in href.lower() for domain in [
-                        'mega.nz', 'mediafire', 'drive.google', 'dropbox', '1fichier',
-                        'uploadhaven', 'zippyshare', 'uptobox', 'google.com', 'pixeldrain',
-                        'up-4ever', 'file-upload', 'sendcm', 'send.cm', 'clicknupload', 'frdl.is',
-                        'buzzheavier', 'ouo.io', 'redirect-to'
-                    ]):
-                        self.current_link = href
+        def flush_data(self):
+            if self.pending_data:
+                data = ''.join(self.pending_data)
+                self.pending_data = []
+                self.process_data(data)
+
+        def close(self):
+            super().close()
+            self.flush_data()
+
+        def handle_starttag(self, tag, attrs):
+            self.flush_data()
+            if tag == 'tr' and ('class', 'post-row') in attrs:
+                self.in_game_row = True
+                self.current_game = {}
+                self.region_text = ""
+            elif self.in_game_row and tag == 'td':
+                self.in_game_cell = True
+            elif self.in_game_cell and tag == 'a':
+                self.parsing_link = True
+                for attr in attrs:
+                    if attr[0] == 'href':
+                        link = attr[1]
+                        if not link.startswith(('http://', 'https://')):
+                            link = f"https://nswdl.com{'' if link.startswith('/') else '/'}{link}"
+                        self.current_game['link'] = link
                         break
+            elif tag == 'span' and self.in_game_cell and any(attr[0] == 'style' and 'color: red' in attr[1] for attr in attrs):
+                self.parsing_region = True
+
+        def handle_endtag(self, tag):
+            self.flush_data()
+            if tag == 'tr' and self.in_game_row:
+                self.in_game_row = False
+                if self.current_game and 'name' in self.current_game and 'link' in self.current_game:
+                    if 'code' not in self.current_game:
+                        self.current_game['code'] = "Unknown"
+                    if self.current_game.get('name') == '(Back to Top)':
+                        return
+                    if self.current_game.get('name', '').startswith('- '):
+                        self.current_game['name'] = self.current_game['name'][2:]
+                    elif self.current_game.get('name', '').startswith('– '):
+                        self.current_game['name'] = self.current_game['name'][2:]
+                    self.current_game['region_text'] = self.region_text
+                    self.games.append(self.current_game)
+            elif tag == 'td' and self.in_game_cell:
+                self.in_game_cell = False
+            elif tag == 'a' and self.parsing_link:
+                self.parsing_link = False
+            elif tag == 'span' and self.parsing_region:
+                self.parsing_region = False
+
+        def handle_comment(self, data):
+            self.flush_data()
 
-    def handle_endtag(self, tag):
-        if tag in self.download_section_tags and self.in_download_section:
-            pass
-        elif tag == 'a' and self.parsing_link:
+        def handle_data(self, data):
+            self.pending_data.append(data)
+
+        def process_data(self, data):
+            if self.parsing_link:
+                clean_data = sub(r'<[^>]*>', '', data).strip()
+                if clean_data:
+                    if 'name' not in self.current_game:
+                        self.current_game['name'] = clean_data
+            elif self.parsing_region:
+                self.region_text += " " + data
+            elif self.in_game_cell:
+                if 'code' not in self.current_game:
+                    code_match = search(r'([0-9A-F]{16})', data)
+                    if code_match:
+                        self.current_game['code'] = code_match.group(1)
+
+    class DetailPageParser(HTMLParser):
+        def __init__(self):
+            super().__init__()
+            self.rows = []
+            self.download_links = []
+            self.seen_links = set()
+            self.section = ""
+            self.box_depth = 0
+            self.in_table = False
+            self.in_tbody = False
+            self.header_parts = None
+            self.row = None
+            self.row_has_header = False
+            self.cell_parts = None
+            self.cell_links = None
+            self.link_href = None
+            self.link_parts = None
+            self.in_download_section = False
             self.parsing_link = False
-            if self.current_link and self.current_text and self.current_link not in [link for _, link in self.download_links]:
-                clean_text = self.current_text.strip()
-                if clean_text:
-                    self.download_links.append((clean_text, self.current_link))
             self.current_link = ""
             self.current_text = ""
+            self.domain_pattern = compiled(DOWNLOAD_DOMAIN_PATTERN, IGNORECASE)
+
+        def handle_starttag(self, tag, attrs):
+            attributes = dict(attrs)
+            if tag == 'div':
+                if self.box_depth:
+                    self.box_depth += 1
+                elif attributes.get('class') == 'download-box':
+                    self.box_depth = 1
+            if tag in DOWNLOAD_SECTION_TAGS and not self.in_download_section:
+                class_attr = (attributes.get('class') or '').lower()
+                id_attr = (attributes.get('id') or '').lower()
+                if any(dl_id in class_attr or dl_id in id_attr for dl_id in DOWNLOAD_IDENTIFIERS):
+                    self.in_download_section = True
+            if self.box_depth:
+                if tag == 'h4':
+                    self.header_parts = []
+                elif tag == 'table' and 'bti-table' in (attributes.get('class') or '').split():
+                    self.in_table = True
+                elif tag == 'tbody' and self.in_table:
+                    self.in_tbody = True
+                elif tag == 'tr' and self.in_tbody:
+                    self.row = []
+                    self.row_has_header = False
+                elif tag == 'th' and self.row is not None:
+                    self.row_has_header = True
+                elif tag == 'td' and self.row is not None:
+                    self.cell_parts = []
+                    self.cell_links = []
+                elif tag == 'a' and self.cell_parts is not None and attributes.get('href'):
+                    self.link_href = attributes['href']
+                    self.link_parts = []
+            if tag == 'a' and self.in_download_section and not self.rows:
+                self.parsing_link = True
+                href = attributes.get('href') or ''
+                if self.domain_pattern.search(href):
+                    self.current_link = href
+
+        def handle_endtag(self, tag):
+            if tag == 'a':
+                if self.link_href is not None:
+                    link_text = ''.join(self.link_parts)
+                    if link_text:
+                        self.cell_links.append((self.link_href, link_text))
+                    self.link_href = None
+                    self.link_parts = None
+                if self.parsing_link:
+                    self.parsing_link = False
+                    clean_text = self.current_text.strip()
+                    if self.current_link and clean_text and self.current_link not in self.seen_links:
+                        self.seen_links.add(self.current_link)
+                        self.download_links.append((clean_text, self.current_link))
+                    self.current_link = ""
+                    self.current_text = ""
+            elif tag == 'td' and self.cell_parts is not None:
+                self.row.append((''.join(self.cell_parts), self.cell_links))
+                self.cell_parts = None
+                self.cell_links = None
+            elif tag == 'tr' and self.row is not None:
+                if not self.row_has_header and len(self.row) >= 3:
+                    self.rows.append((self.section, self.row))
+                self.row = None
+            elif tag == 'tbody':
+                self.in_tbody = False
+            elif tag == 'table':
+                self.in_table = False
+            elif tag == 'h4' and self.header_parts is not None:
+                self.section = ''.join(self.header_parts).strip()
+                self.header_parts = None
+            elif tag == 'div' and self.box_depth:
+                self.box_depth -= 1
+
+        def handle_data(self, data):
+            if self.header_parts is not None:
+                self.header_parts.append(data)
+            if self.cell_parts is not None:
+                self.cell_parts.append(data)
+            if self.link_parts is not None:
+                self.link_parts.append(data)
+            if self.parsing_link:
+                self.current_text += data
+
+    return {'GameParser': GameParser, 'DetailPageParser': DetailPageParser}
+
+def __getattr__(name):
+    if name in ('GameParser', 'DetailPageParser'):
+        return html_parser_classes()[name]
+    if name in ('ServeRequestHandler', 'CatalogUnixServer'):
+        return serve_classes()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+class ProfileStage:
+    __slots__ = ('profiler', 'name', 'start')
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.profiler.add(self.name, perf_counter() - self.start)
+
+class Profiler:
+    def __init__(self):
+        self.lock = Lock()
+        self.timings = {}
+        self.counters = {}
+        self.http_counters = {}
+
+    def stage(self, name):
+        return ProfileStage(self, name)
+
+    def add(self, name, elapsed):
+        with self.lock:
+            timing = self.timings.setdefault(name, [0, 0.0])
+            timing[0] += 1
+            timing[1] += elapsed
+
+    def count(self, name, amount=1):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def timed(self, name, function):
+        def wrapper(*args, **kwargs):
+            with self.stage(name):
+                return function(*args, **kwargs)
+        return wrapper
+
+    def reset(self):
+        with self.lock:
+            self.timings = {}
+            self.counters = {}
+
+    def report(self, extra_counters=None):
+        lines = [f"{'stage':<24}{'calls':>10}{'total ms':>12}{'avg ms':>10}"]
+        for name, (calls, total) in sorted(self.timings.items()):
+            lines.append(f"{name:<24}{calls:>10}{total * 1000:>12.2f}{total * 1000 / calls:>10.3f}")
+        counters = dict(self.counters)
+        counters.update(extra_counters or {})
+        if counters:
+            lines.append(f"{'counter':<24}{'value':>10}")
+            for name, value in sorted(counters.items()):
+                lines.append(f"{name:<24}{value:>10}")
+        return '\n'.join(lines)
+
+NULL_STAGE = nullcontext()
+profiler = None
+
+def stage(name):
+    if profiler is None:
+        return NULL_STAGE
+    return profiler.stage(name)
+
+def count(name, amount=1):
+    if profiler is not None:
+        profiler.count(name, amount)
+
+def enable_profiling():
+    global profiler
+    if profiler is None:
+        profiler = Profiler()
+        if classifier is not None:
+            profile_classifier(classifier)
+    return profiler
+
+def profile_classifier(classifier):
+    classifier.classify_file = profiler.timed('classify.file', classifier.classify_file)
+    classifier.classify_regions = profiler.timed('classify.regions', classifier.classify_regions)
+
+def print_profile_report():
+    if profiler is None:
+        return
+    extra_counters = {}
+    if http_session is not None:
+        http_counters = dict(http_session.counters)
+        extra_counters = {
+            f"http.{name}": value - profiler.http_counters.get(name, 0)
+            for name, value in http_counters.items()
+            if value != profiler.http_counters.get(name, 0)
+        }
+        profiler.http_counters = http_counters
+    if not profiler.timings and not profiler.counters and not extra_counters:
+        return
+    print("\nProfile:", file=stderr)
+    print(profiler.report(extra_counters), file=stderr)
+    profiler.reset()
+
+def start_capture():
+    from cProfile import Profile
+    from tracemalloc import start
+    start()
+    capture = Profile()
+    capture.enable()
+    return capture
+
+def stop_capture(capture, capture_dir):
+    from pstats import Stats
+    from tracemalloc import get_traced_memory, stop, take_snapshot
+    capture.disable()
+    makedirs(capture_dir, exist_ok=True)
+    capture.dump_stats(path.join(capture_dir, 'profile.pstats'))
+    with open(path.join(capture_dir, 'profile.txt'), 'w', encoding='utf-8') as f:
+        Stats(capture, stream=f).sort_stats('cumulative').print_stats(50)
+    current, peak = get_traced_memory()
+    snapshot = take_snapshot()
+    stop()
+    with open(path.join(capture_dir, 'memory.txt'), 'w', encoding='utf-8') as f:
+        f.write(f"current {current} bytes, peak {peak} bytes\n")
+        for statistic in snapshot.statistics('lineno')[:50]:
+            f.write(f"{statistic}\n")
+    print(f"Profile reports have been saved to '{capture_dir}'", file=stderr)
+
+class DecodedResponse:
+    def __init__(self, session, key, connection, response, url):
+        self.session = session
+        self.key = key
+        self.connection = connection
+        self.response = response
+        self.url = url
+        self.status = response.status
+        self.headers = response.headers
+        self.buffer = bytearray()
+        self.eof = False
+        encoding = (response.getheader('Content-Encoding') or '').strip().lower()
+        self.raw_deflate_fallback = encoding == 'deflate'
+        if encoding in ('gzip', 'x-gzip'):
+            self.decompressor = decompressobj(16 + MAX_WBITS)
+        elif encoding == 'deflate':
+            self.decompressor = decompressobj(MAX_WBITS)
+        else:
+            self.decompressor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def decompress(self, raw):
+        try:
+            data = self.decompressor.decompress(raw)
+        except ZlibError:
+            if not self.raw_deflate_fallback:
+                raise
+            self.decompressor = decompressobj(-MAX_WBITS)
+            data = self.decompressor.decompress(raw)
+        self.raw_deflate_fallback = False
+        return data
+
+    def read(self, size=-1):
+        read_all = size is None or size < 0
+        while not self.eof and (read_all or len(self.buffer) < size):
+            raw = self.response.read(STREAM_CHUNK_SIZE)
+            self.session.count(wire=len(raw))
+            if not raw:
+                self.eof = True
+                if self.decompressor is not None:
+                    self.buffer += self.decompressor.flush()
+                break
+            self.buffer += self.decompress(raw) if self.decompressor is not None else raw
+        if read_all:
+            size = len(self.buffer)
+        data = bytes(self.buffer[:size])
+        del self.buffer[:size]
+        self.session.count(decoded=len(data))
+        return data
+
+    def close(self):
+        if self.connection is None:
+            return
+        if self.eof and not self.response.will_close:
+            self.session.release(self.key, self.connection)
+        else:
+            self.connection.close()
+        self.connection = None
+
+class HTTPSession:
+    def __init__(self, headers=DEFAULT_HEADERS, max_idle_per_host=BATCH_PER_HOST):
+        self.headers = dict(headers)
+        self.max_idle_per_host = max_idle_per_host
+        self.idle = {}
+        self.lock = Lock()
+        self.counters = {'requests': 0, 'connections': 0, 'bytes_wire': 0, 'bytes_decoded': 0}
+
+    def count(self, requests=0, connections=0, wire=0, decoded=0):
+        with self.lock:
+            self.counters['requests'] += requests
+            self.counters['connections'] += connections
+            self.counters['bytes_wire'] += wire
+            self.counters['bytes_decoded'] += decoded
+
+    def acquire(self, key, timeout):
+        with self.lock:
+            idle = self.idle.get(key)
+            if idle:
+                connection = idle.pop()
+                connection.timeout = timeout
+                if connection.sock is not None:
+                    connection.sock.settimeout(timeout)
+                return connection, True
+        from http.client import HTTPConnection, HTTPSConnection
+        self.count(connections=1)
+        scheme, host = key
+        connection_class = HTTPSConnection if scheme == 'https' else HTTPConnection
+        return connection_class(host, timeout=timeout), False
+
+    def release(self, key, connection):
+        with self.lock:
+            idle = self.idle.setdefault(key, [])
+            if len(idle) < self.max_idle_per_host:
+                idle.append(connection)
+                return
+        connection.close()
+
+    def close(self):
+        with self.lock:
+            idle, self.idle = self.idle, {}
+        for connections in idle.values():
+            for connection in connections:
+                connection.close()
+
+    def send(self, url, headers, timeout):
+        from http.client import HTTPException
+        from urllib.parse import urlparse
+        parsed_url = urlparse(url)
+        key = (parsed_url.scheme, parsed_url.netloc)
+        target = parsed_url.path or '/'
+        if parsed_url.query:
+            target += '?' + parsed_url.query
+        while True:
+            connection, reused = self.acquire(key, timeout)
+            try:
+                connection.request('GET', target, headers=headers)
+                response = connection.getresponse()
+            except (OSError, HTTPException):
+                connection.close()
+                if reused:
+                    continue
+                raise
+            self.count(requests=1)
+            return DecodedResponse(self, key, connection, response, url)
+
+    def get(self, url, headers=None, timeout=REQUEST_TIMEOUT):
+        from urllib.parse import urljoin
+        request_headers = dict(self.headers)
+        if headers:
+            request_headers.update(headers)
+        for _ in range(MAX_REDIRECTS + 1):
+            response = self.send(url, request_headers, timeout)
+            location = response.headers.get('Location')
+            if response.status not in REDIRECT_STATUSES or not location:
+                break
+            response.read()
+            response.close()
+            url = urljoin(url, location)
+        if response.status >= 400:
+            from urllib.error import HTTPError
+            response.read()
+            response.close()
+            raise HTTPError(url, response.status, response.response.reason, response.headers, None)
+        return response
+
+http_session = None
+http_session_lock = Lock()
+
+def get_http_session():
+    global http_session
+    with http_session_lock:
+        if http_session is None:
+            http_session = HTTPSession()
+    return http_session
+
+class CachingResponse:
+    def __init__(self, cache, url, response):
+        self.cache = cache
+        self.url = url
+        self.response = response
+        from gzip import open as gzip_open
+        from tempfile import mkstemp
+        descriptor, self.temp_path = mkstemp(dir=cache.cache_dir, suffix='.tmp')
+        close(descriptor)
+        self.writer = gzip_open(self.temp_path, 'wb')
+        self.complete = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def read(self, size=-1):
+        data = self.response.read(size)
+        self.writer.write(data)
+        if not data or size is None or size < 0:
+            self.complete = True
+        return data
+
+    def close(self):
+        if self.writer is None:
+            return
+        self.response.close()
+        self.writer.close()
+        self.writer = None
+        if self.complete:
+            self.cache.store(self.url, self.temp_path, self.response.headers.get('ETag'), self.response.headers.get('Last-Modified'))
+        else:
+            remove(self.temp_path)
+
+class HTTPCache:
+    def __init__(self, cache_dir=CACHE_DIR, ttl=CACHE_TTL, max_size=CACHE_MAX_SIZE):
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.max_size = max_size
+        self.lock = Lock()
+        from sqlite3 import connect
+        makedirs(cache_dir, exist_ok=True)
+        self.conn = connect(path.join(cache_dir, 'index.db'), check_same_thread=False)
+        self.conn.execute('''
+        CREATE TABLE IF NOT EXISTS entries (
+            url TEXT PRIMARY KEY,
+            file TEXT,
+            etag TEXT,
+            last_modified TEXT,
+            fetched_at REAL,
+            accessed_at REAL,
+            size INTEGER
+        )''')
+        self.conn.commit()
+
+    def file_path(self, url):
+        from hashlib import sha256
+        return path.join(self.cache_dir, sha256(url.encode('utf-8')).hexdigest() + '.gz')
+
+    def lookup(self, url):
+        with self.lock:
+            entry = self.conn.execute(
+                "SELECT etag, last_modified, fetched_at FROM entries WHERE url = ?", (url,)
+            ).fetchone()
+        if entry is not None and not path.exists(self.file_path(url)):
+            self.invalidate(url)
+            return None
+        return entry
+
+    def touch(self, url, refreshed=False):
+        now = time()
+        with self.lock, self.conn:
+            if refreshed:
+                self.conn.execute("UPDATE entries SET fetched_at = ?, accessed_at = ? WHERE url = ?", (now, now, url))
+            else:
+                self.conn.execute("UPDATE entries SET accessed_at = ? WHERE url = ?", (now, url))
+
+    def store(self, url, temp_path, etag, last_modified):
+        file_path = self.file_path(url)
+        replace(temp_path, file_path)
+        now = time()
+        with self.lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (url, path.basename(file_path), etag, last_modified, now, now, path.getsize(file_path))
+            )
+        self.evict()
 
-    def handle_data(self, data):
-        if self.parsing_link:
-            self.current_text += data
+    def invalidate(self, url):
+        file_path = self.file_path(url)
+        if path.exists(file_path):
+            remove(file_path)
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM entries WHERE url = ?", (url,))
+
+    def evict(self):
+        with self.lock:
+            rows = self.conn.execute("SELECT url, file, size FROM entries ORDER BY accessed_at DESC").fetchall()
+        total = 0
+        for url, file_name, size in rows:
+            total += size
+            if total > self.max_size:
+                self.invalidate(url)
+
+    def open(self, url, max_age=None, timeout=REQUEST_TIMEOUT):
+        from gzip import open as gzip_open
+        max_age = self.ttl if max_age is None else max_age
+        entry = self.lookup(url)
+        if entry is not None and time() - entry[2] < max_age:
+            self.touch(url)
+            return gzip_open(self.file_path(url), 'rb'), False
+        request_headers = {}
+        if entry is not None:
+            if entry[0]:
+                request_headers['If-None-Match'] = entry[0]
+            if entry[1]:
+                request_headers['If-Modified-Since'] = entry[1]
+        response = get_http_session().get(url, request_headers, timeout)
+        if response.status == 304 and entry is not None:
+            response.read()
+            response.close()
+            self.touch(url, refreshed=True)
+            return gzip_open(self.file_path(url), 'rb'), False
+        return CachingResponse(self, url, response), True
+
+http_cache = None
+http_cache_lock = Lock()
+
+def get_http_cache():
+    global http_cache
+    with http_cache_lock:
+        if http_cache is None:
+            http_cache = HTTPCache()
+    return http_cache
+
+def open_url(url, max_age=None, timeout=REQUEST_TIMEOUT):
+    return get_http_cache().open(url, max_age, timeout)
+
+class LinkCache:
+    def __init__(self, cache_file=LINK_CACHE_FILE, ttl=LINK_CACHE_TTL, max_size=LINK_CACHE_MAX_SIZE):
+        from sqlite3 import connect
+        self.ttl = ttl
+        self.max_size = max_size
+        self.lock = Lock()
+        cache_dir = path.dirname(cache_file)
+        if cache_dir:
+            makedirs(cache_dir, exist_ok=True)
+        self.conn = connect(cache_file, check_same_thread=False)
+        self.conn.execute('''
+        CREATE TABLE IF NOT EXISTS links (
+            url TEXT PRIMARY KEY,
+            links TEXT,
+            fetched_at REAL,
+            accessed_at REAL,
+            size INTEGER
+        )''')
+        self.conn.commit()
+
+    def get(self, url, max_age=None, refresh=False):
+        max_age = self.ttl if max_age is None else max_age
+        with self.lock:
+            entry = self.conn.execute("SELECT links, fetched_at FROM links WHERE url = ?", (url,)).fetchone()
+            if entry is None or (not refresh and time() - entry[1] >= max_age):
+                return None
+            now = time()
+            with self.conn:
+                if refresh:
+                    self.conn.execute("UPDATE links SET fetched_at = ?, accessed_at = ? WHERE url = ?", (now, now, url))
+                else:
+                    self.conn.execute("UPDATE links SET accessed_at = ? WHERE url = ?", (now, url))
+        return [tuple(link) for link in loads(entry[0])]
+
+    def store(self, url, download_links):
+        data = dumps(download_links, ensure_ascii=False, separators=(',', ':'))
+        now = time()
+        with self.lock, self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO links VALUES (?, ?, ?, ?, ?)", (url, data, now, now, len(data)))
+        self.evict()
+
+    def invalidate(self, url=None):
+        with self.lock, self.conn:
+            if url is None:
+                self.conn.execute("DELETE FROM links")
+            else:
+                self.conn.execute("DELETE FROM links WHERE url = ?", (url,))
+
+    def evict(self):
+        with self.lock:
+            rows = self.conn.execute("SELECT url, size FROM links ORDER BY accessed_at DESC").fetchall()
+        total = 0
+        stale = []
+        for url, size in rows:
+            total += size
+            if total > self.max_size:
+                stale.append((url,))
+        if stale:
+            with self.lock, self.conn:
+                self.conn.executemany("DELETE FROM links WHERE url = ?", stale)
+
+link_cache = None
+link_cache_lock = Lock()
+
+def get_link_cache():
+    global link_cache
+    with link_cache_lock:
+        if link_cache is None:
+            link_cache = LinkCache()
+    return link_cache
+
+class Classifier:
+    def __init__(self, cache_size=CLASSIFIER_CACHE_SIZE):
+        self.file_info_pattern = compiled(FILE_INFO_PATTERN)
+        self.name_region_pattern = compiled(NAME_REGION_PATTERN, IGNORECASE)
+        self.classify_file = lru_cache(maxsize=cache_size)(self.classify_file)
+        self.classify_regions = lru_cache(maxsize=cache_size)(self.classify_regions)
+
+    def classify_file(self, filename):
+        lower_name = filename.lower()
+        file_format = "Unknown"
+        if ".nsp" in lower_name:
+            file_format = "NSP"
+        elif ".xci" in lower_name:
+            file_format = "XCI"
+        elif ".rar" in lower_name or ".zip" in lower_name:
+            file_format = "Archive"
+        if "update" in lower_name or "[v" in lower_name or "patch" in lower_name or "(v" in lower_name or "+v" in lower_name:
+            file_type = "Update"
+        elif "dlc" in lower_name or "addon" in lower_name:
+            file_type = "DLC"
+        else:
+            file_type = "Base Game"
+        version_rank = len(VERSION_PATTERNS)
+        version = "Unknown"
+        regions_found = set()
+        for match in self.file_info_pattern.finditer(filename):
+            group_name = match.lastgroup
+            if group_name.startswith('r_'):
+                regions_found.add(group_name[2:])
+            elif int(group_name[1:]) < version_rank:
+                version_rank = int(group_name[1:])
+                version = match.group(group_name)
+        if version.isdigit() and len(version) >= 5:
+            num_version = int(version)
+            major = num_version >> 16
+            minor = (num_version >> 8) & 0xFF
+            patch = num_version & 0xFF
+            if major > 0:
+                version = f"{major}.{minor}.{patch}"
+        region = ",".join(region for region in FILE_REGION_PATTERNS if region in regions_found) or "Unknown"
+        return file_type, file_format, version, region
+
+    def classify_regions(self, combined_text):
+        regions = []
+        for match in self.name_region_pattern.finditer(combined_text):
+            region = match.group(1)
+            std_region = NAME_REGION_MAP.get(region.lower(), region.upper())
+            if std_region not in regions:
+                regions.append(std_region)
+        return tuple(regions) or ('All', 'US')
+
+    def parse_file_info(self, filename):
+        file_type, file_format, version, region = self.classify_file(filename)
+        return {
+            "type": file_type,
+            "format": file_format,
+            "version": version,
+            "region": region
+        }
+
+    def extract_regions(self, game_name, region_text=""):
+        return list(self.classify_regions(game_name + " " + region_text))
+
+    def parse_file_infos(self, filenames):
+        return [self.parse_file_info(filename) for filename in filenames]
+
+    def extract_regions_batch(self, names):
+        return [self.extract_regions(game_name, region_text) for game_name, region_text in names]
+
+classifier = None
+classifier_lock = Lock()
+
+def get_classifier():
+    global classifier
+    with classifier_lock:
+        if classifier is None:
+            classifier = Classifier()
+            if profiler is not None:
+                profile_classifier(classifier)
+    return classifier
 
 def extract_regions_from_name(game_name, region_text=""):
-    regions = []
-    combined_text = game_name + " " + region_text
-    region_pattern = r'\b(JP|US|USA|EU|UK|AS|CH|KOR|TW|FR|DE|IT|ES|Asia|Japan|America|Europe|England|China|Korea|Taiwan|France|Germany|Italy|Spain)\b'
-    explicit_regions = findall(region_pattern, combined_text, IGNORECASE)
-    region_map = {
-        'japan': 'JP', 'jp': 'JP',
-        'us': 'US', 'usa': 'US', 'america': 'US',
-        'eu': 'EU', 'europe': 'EU',
-        'uk': 'UK', 'england': 'UK',
-        'as': 'AS', 'asia': 'AS',
-        'ch': 'CH', 'china': 'CH', 'chinese': 'CH',
-        'kor': 'KOR', 'korea': 'KOR', 'korean': 'KOR', 'ko': 'KOR',
-        'tw': 'TW', 'taiwan': 'TW',
-        'fr': 'FR', 'france': 'FR', 'french': 'FR',
-        'de': 'DE', 'germany': 'DE', 'german': 'DE',
-        'it': 'IT', 'italy': 'IT', 'italian': 'IT',
-        'es': 'ES', 'spain': 'ES', 'spanish': 'ES', 'spa': 'ES'
-    }
-    for region in explicit_regions:
-        std_region = region_map.get(region.lower(), region.upper())
-        if std_region not in regions:
-            regions.append(std_region)
-    if search(r'\bUSA\b|\bUS\b|(?<!\w)USA(?!\w)|(?<!\w)US(?!\w)|\(USA\)|\(US\)|\[USA\]|\[US\]', combined_text, IGNORECASE):
-        if 'US' not in regions:
-            regions.append('US')
-    if search(r'\bEU\b|(?<!\w)EU(?!\w)|\(EU\)|\[EU\]', combined_text, IGNORECASE):
-        if 'EU' not in regions:
-            regions.append('EU')
-    if search(r'\bJP\b|(?<!\w)JP(?!\w)|\(JP\)|\[JP\]', combined_text, IGNORECASE):
-        if 'JP' not in regions:
-            regions.append('JP')
-    if not regions:
-        regions = ['All']
-        if 'US' not in regions:
-            regions.append('US')
-    return regions
+    return get_classifier().extract_regions(game_name, region_text)
+
+def is_us_game(game):
+    return 'US' in game.get('regions', []) or 'All' in game.get('regions', [])
 
 def filter_us_games(games):
-    return [game for game in games if 'US' in game.get('regions', []) or 'All' in game.get('regions', [])]
+    return [game for game in games if is_us_game(game)]
 
 def add_regions_to_existing_games(games):
     updated_count = 0
-    should_remake = True
-    if not should_remake:
+    for game in games:
+        if 'regions' not in game or game['regions'] == ['Unknown']:
+            game['regions'] = extract_regions_from_name(game.get('name', ''))
+            if game['regions'] != ['Unknown']:
+                updated_count += 1
+    return games, updated_count
+
+def classify_chunk(method, items):
+    return getattr(get_classifier(), method)(items)
+
+def classify_parallel(method, items, workers=CLASSIFY_WORKERS, threshold=CLASSIFY_PARALLEL_THRESHOLD, chunk_size=CLASSIFY_CHUNK_SIZE):
+    items = iter(items)
+    classify_batch = getattr(get_classifier(), method)
+    seen = 0
+    for item in items if workers <= 1 else islice(items, threshold):
+        seen += 1
+        yield classify_batch((item,))[0]
+    if workers <= 1 or seen < threshold:
+        return
+    from concurrent.futures import ProcessPoolExecutor
+    count('classify.parallel')
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        window = deque()
+        for chunk in batched(items, chunk_size):
+            window.append(executor.submit(classify_chunk, method, chunk))
+            while window and (len(window) > 2 * workers or window[0].done()):
+                yield from window.popleft().result()
+        while window:
+            yield from window.popleft().result()
+
+def classify_games(games, workers=CLASSIFY_WORKERS, threshold=CLASSIFY_PARALLEL_THRESHOLD):
+    pending = deque()
+
+    def names():
         for game in games:
-            if 'regions' not in game or game['regions'] == ['Unknown']:
-                game['regions'] = extract_regions_from_name(game.get('name', ''))
-                if game['regions'] != ['Unknown']:
-                    updated_count += 1
-        return games, updated_count
-    else:
-        print("Detecting region issues. Rebuilding the game database...")
-        return fetch_games_from_website(), len(games)
+            pending.append(game)
+            yield game.get('name', ''), game.pop('region_text', '')
+
+    for regions in classify_parallel('extract_regions_batch', names(), workers, threshold):
+        game = pending.popleft()
+        game['regions'] = regions
+        yield game
+
+def iter_games_from_stream(stream, chunk_size=STREAM_CHUNK_SIZE, workers=CLASSIFY_WORKERS):
+    return classify_games(iter_parsed_games(stream, chunk_size), workers)
+
+def iter_parsed_games(stream, chunk_size=STREAM_CHUNK_SIZE):
+    decoder = getincrementaldecoder('utf-8')()
+    parser = html_parser_classes()['GameParser']()
+    while True:
+        with stage('index.read'):
+            chunk = stream.read(chunk_size)
+        with stage('index.decode'):
+            text = decoder.decode(chunk, final=not chunk)
+        with stage('index.parse'):
+            parser.feed(text)
+        games, parser.games = parser.games, []
+        count('index.games', len(games))
+        yield from games
+        if not chunk:
+            break
+    parser.close()
+    yield from parser.games
+
+def iter_games_from_website(url=INDEX_URL, max_age=None):
+    stream, modified = open_url(url, max_age)
+    with stream:
+        yield from iter_games_from_stream(stream)
 
 def fetch_games_from_website():
-    url = "https://nsw2u.com/switch-posts"
     games = []
     try:
-        headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'}
-        req = Request(url, headers=headers)
-        with urlopen(req) as response:
-            html = response.read().decode('utf-8')
-            parser = GameParser()
-            parser.feed(html)
-            games = parser.games
+        games = list(iter_games_from_website())
     except Exception as e:
-        print(f"Error fetching games: {e}")
+        print(f"Error fetching games: {e}", file=stderr)
     return games
 
-def download_games():
-    games = fetch_games_from_website()
-    games = [game for game in games if game.get('name') != '(Back to Top)']
-    us_games = filter_us_games(games)
-    with open(JSON_FILE, 'w', encoding='utf-8') as f:
-        dump(games, f, ensure_ascii=False, separators=(',', ':'))
-    with open(US_JSON_FILE, 'w', encoding='utf-8') as f_us:
-        dump(us_games, f_us, ensure_ascii=False, separators=(',', ':'))
-    print(f"Full game list has been saved to '{JSON_FILE}'")
-    print(f"US games list has been saved to '{US_JSON_FILE}'")
+def encode_regions(regions):
+    mask = 0
+    for region in regions:
+        mask |= REGION_BITS.get(region, REGION_BITS['Unknown'])
+    return mask
+
+def decode_regions(mask, region_codes=REGION_CODES):
+    return [region for i, region in enumerate(region_codes) if mask >> i & 1]
+
+def encode_code(code):
+    try:
+        return int(code, 16) if len(code) == 16 else 0
+    except ValueError:
+        return 0
+
+def decode_code(value):
+    return f"{value:016X}" if value else "Unknown"
+
+def title_base_id(title_id):
+    return title_id & ~TITLE_BASE_MASK
+
+def title_kind(title_id):
+    offset = title_id & TITLE_BASE_MASK
+    if offset == 0:
+        return 'base'
+    if offset == TITLE_UPDATE_OFFSET:
+        return 'update'
+    if offset >= TITLE_DLC_OFFSET:
+        return 'dlc'
+    return 'unknown'
+
+def align(offset, size=8):
+    return (offset + size - 1) // size * size
+
+def pack_catalog(games):
+    codes = array('Q')
+    masks = array('I')
+    name_index = array('I', [0])
+    link_index = array('I', [0])
+    names = bytearray()
+    links = bytearray()
+    for game in games:
+        codes.append(encode_code(game.get('code', 'Unknown')))
+        masks.append(encode_regions(game.get('regions', ['Unknown'])))
+        names += game.get('name', '').encode('utf-8')
+        links += game.get('link', '').encode('utf-8')
+        name_index.append(len(names))
+        link_index.append(len(links))
+    if byteorder == 'big':
+        for column in (codes, masks, name_index, link_index):
+            column.byteswap()
+    region_table = '\n'.join(REGION_CODES).encode('utf-8')
+    return [region_table, codes, masks, name_index, link_index, names, links]
+
+def save_catalog(sections, catalog_file=CATALOG_FILE):
+    region_table, codes = sections[:2]
+    offsets = []
+    offset = CATALOG_HEADER.size
+    for section in sections:
+        offset = align(offset)
+        offsets.append(offset)
+        offset += len(memoryview(section).cast('B'))
+    temp_file = catalog_file + '.tmp'
+    try:
+        with open(temp_file, 'wb') as f:
+            f.write(CATALOG_HEADER.pack(CATALOG_MAGIC, CATALOG_VERSION, len(codes), len(region_table), *offsets, offset))
+            for section_offset, section in zip(offsets, sections):
+                f.write(b'\0' * (section_offset - f.tell()))
+                f.write(section)
+    except BaseException:
+        if path.exists(temp_file):
+            remove(temp_file)
+        raise
+    replace(temp_file, catalog_file)
+
+def write_catalog(games, catalog_file=CATALOG_FILE):
+    save_catalog(pack_catalog(games), catalog_file)
+
+class Catalog:
+    def __init__(self, catalog_file=CATALOG_FILE):
+        self.file = open(catalog_file, 'rb')
+        self.buffer = mmap(self.file.fileno(), 0, access=ACCESS_READ)
+        self.views = [memoryview(self.buffer)]
+        magic, version, self.count, regions_length, regions_offset, codes_offset, masks_offset, name_index_offset, link_index_offset, names_offset, links_offset, end_offset = CATALOG_HEADER.unpack_from(self.buffer)
+        if magic != CATALOG_MAGIC or version != CATALOG_VERSION:
+            self.close()
+            raise ValueError(f"Unsupported catalog file: {catalog_file}")
+        self.region_codes = str(self.views[0][regions_offset:regions_offset + regions_length], 'utf-8').split('\n')
+        self.codes = self.column(codes_offset, 'Q', self.count)
+        self.masks = self.column(masks_offset, 'I', self.count)
+        self.name_index = self.column(name_index_offset, 'I', self.count + 1)
+        self.link_index = self.column(link_index_offset, 'I', self.count + 1)
+        self.names = self.views[0][names_offset:names_offset + self.name_index[self.count]]
+        self.links = self.views[0][links_offset:links_offset + self.link_index[self.count]]
+        self.us_mask = sum(1 << i for i, region in enumerate(self.region_codes) if region in ('US', 'All'))
+        self.views += [self.names, self.links]
+
+    def column(self, offset, typecode, count):
+        size = array(typecode).itemsize * count
+        if byteorder == 'big':
+            column = array(typecode, self.views[0][offset:offset + size])
+            column.byteswap()
+            return column
+        view = self.views[0][offset:offset + size].cast(typecode)
+        self.views.append(view)
+        return view
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        for view in reversed(self.views):
+            view.release()
+        self.views = []
+        self.buffer.close()
+        self.file.close()
+
+    def __len__(self):
+        return self.count
+
+    def name(self, index):
+        return str(self.names[self.name_index[index]:self.name_index[index + 1]], 'utf-8')
+
+    def link(self, index):
+        return str(self.links[self.link_index[index]:self.link_index[index + 1]], 'utf-8')
+
+    def code(self, index):
+        return decode_code(self.codes[index])
+
+    def regions(self, index):
+        return decode_regions(self.masks[index], self.region_codes)
+
+    def __getitem__(self, index):
+        return {
+            'name': self.name(index),
+            'link': self.link(index),
+            'code': self.code(index),
+            'regions': self.regions(index)
+        }
+
+    def __iter__(self):
+        for index in range(self.count):
+            yield self[index]
+
+    def us_indices(self):
+        return [index for index, mask in enumerate(self.masks) if mask & self.us_mask]
+
+    def us_games(self):
+        for index in self.us_indices():
+            yield self[index]
+
+def export_catalog_json(catalog, json_file=JSON_FILE, us_only=False):
+    games = catalog.us_games() if us_only else iter(catalog)
+    temp_file = json_file + '.tmp'
+    try:
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            f.write('[')
+            for i, game in enumerate(games):
+                if i:
+                    f.write(',')
+                f.write(dumps(game, ensure_ascii=False, separators=(',', ':')))
+            f.write(']')
+    except BaseException:
+        if path.exists(temp_file):
+            remove(temp_file)
+        raise
+    replace(temp_file, json_file)
+
+def ensure_catalog(catalog_file=CATALOG_FILE, json_file=JSON_FILE):
+    if not path.exists(catalog_file) and path.exists(json_file):
+        with open(json_file, 'r', encoding='utf-8') as f:
+            write_catalog(load(f), catalog_file)
+    return path.exists(catalog_file)
+
+def is_catalog_current():
+    if not all(path.exists(file) for file in (CATALOG_FILE, JSON_FILE, US_JSON_FILE, DB_FILE)):
+        return False
+    from sqlite3 import connect
+    conn = connect(DB_FILE)
+    try:
+        return is_games_db_current(conn)
+    finally:
+        conn.close()
+
+def download_games(max_age=None, verbose=True, workers=CLASSIFY_WORKERS):
+    try:
+        with stage('index.fetch'):
+            stream, modified = open_url(INDEX_URL, max_age)
+        with stream:
+            if not modified and is_catalog_current():
+                if verbose:
+                    print("Games list is already up to date.")
+                return {'added': 0, 'removed': 0, 'changed': 0, 'written': False}
+            games = (game for game in iter_games_from_stream(stream, workers=workers) if game.get('name') != '(Back to Top)')
+            delta = update_games_catalog(games)
+    except Exception as e:
+        print(f"Error fetching games: {e}", file=stderr)
+        return
+    if verbose:
+        print(f"Catalog changes: {delta['added']} added, {delta['removed']} removed, {delta['changed']} changed")
+        if delta['written']:
+            print(f"Game catalog has been saved to '{CATALOG_FILE}'")
+            print(f"Full game list has been saved to '{JSON_FILE}'")
+            print(f"US games list has been saved to '{US_JSON_FILE}'")
+            print(f"Game database has been saved to '{DB_FILE}'")
+        else:
+            print("Games list is already up to date.")
+    return delta
 
 def remove_accents(input_str):
+    from unicodedata import normalize, combining
     nfkd_form = normalize('NFKD', input_str)
     return ''.join([c for c in nfkd_form if not combining(c)])
 
-def load_games_to_db():
-    conn = connect(':memory:')
+def fold_name(name):
+    return remove_accents(name).casefold()
+
+def get_catalog_fingerprint(catalog_file=CATALOG_FILE):
+    if not path.exists(catalog_file):
+        return ''
+    stat_result = stat(catalog_file)
+    return f"{stat_result.st_size}:{stat_result.st_mtime_ns}"
+
+def batched(iterable, size=DB_BATCH_SIZE):
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def game_to_row(game):
+    name = game.get('name', '')
+    code = game.get('code', 'Unknown')
+    title_id = encode_code(code)
+    return (
+        name,
+        fold_name(name),
+        game.get('link', ''),
+        code,
+        encode_regions(game.get('regions', ['Unknown'])),
+        title_base_id(title_id) if 0 < title_id < 1 << 63 else None
+    )
+
+def build_games_db(games, db_file=DB_FILE, catalog_file=CATALOG_FILE):
+    from sqlite3 import connect
+    conn = connect(db_file)
+    try:
+        fill_games_db(conn, games, catalog_file)
+    except BaseException:
+        conn.rollback()
+        conn.close()
+        raise
+    return conn
+
+def fill_games_db(conn, games, catalog_file):
+    from sqlite3 import OperationalError
     cursor = conn.cursor()
+    if not conn.in_transaction:
+        cursor.execute('BEGIN')
+    cursor.execute('DROP TABLE IF EXISTS games_fts')
+    cursor.execute('DROP TABLE IF EXISTS games')
+    cursor.execute('DROP TABLE IF EXISTS meta')
+    cursor.execute('DROP TABLE IF EXISTS fuzzy_terms')
+    cursor.execute('DROP TABLE IF EXISTS fuzzy_grams')
     cursor.execute('''
-    CREATE TABLE IF NOT EXISTS games (
+    CREATE TABLE games (
+        id INTEGER PRIMARY KEY,
         name TEXT,
+        search_name TEXT,
         link TEXT,
         code TEXT,
-        regions TEXT
+        region_mask INTEGER,
+        base_id INTEGER
     )''')
-    if path.exists(JSON_FILE):
-        with open(JSON_FILE, 'r', encoding='utf-8') as f:
-            games = load(f)
-            for game in games:
-                cursor.execute(
-                    "INSERT INTO games VALUES (?, ?, ?, ?)",
-                    (
-                        game.get('name', ''),
-                        game.get('link', ''),
-                        game.get('code', 'Unknown'),
-                        dumps(game.get('regions', ['Unknown']))
-                    )
-                )
+    cursor.execute('CREATE INDEX games_base_id ON games (base_id)')
+    cursor.execute('CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT)')
+    cursor.execute('CREATE TABLE fuzzy_terms (id INTEGER PRIMARY KEY, term TEXT, games BLOB)')
+    cursor.execute('CREATE UNIQUE INDEX fuzzy_terms_term ON fuzzy_terms (term)')
+    cursor.execute('CREATE TABLE fuzzy_grams (gram TEXT PRIMARY KEY, terms BLOB) WITHOUT ROWID')
+    for batch in batched(game_to_row(game) for game in games):
+        cursor.executemany("INSERT INTO games (name, search_name, link, code, region_mask, base_id) VALUES (?, ?, ?, ?, ?, ?)", batch)
+    try:
+        cursor.execute('''
+        CREATE VIRTUAL TABLE games_fts USING fts5(
+            search_name,
+            content='games',
+            content_rowid='id',
+            tokenize='trigram'
+        )''')
+        cursor.execute("INSERT INTO games_fts(games_fts) VALUES ('rebuild')")
+        cursor.execute('''
+        CREATE TRIGGER games_ai AFTER INSERT ON games BEGIN
+            INSERT INTO games_fts(rowid, search_name) VALUES (new.id, new.search_name);
+        END''')
+        cursor.execute('''
+        CREATE TRIGGER games_ad AFTER DELETE ON games BEGIN
+            INSERT INTO games_fts(games_fts, rowid, search_name) VALUES ('delete', old.id, old.search_name);
+        END''')
+        cursor.execute('''
+        CREATE TRIGGER games_au AFTER UPDATE ON games BEGIN
+            INSERT INTO games_fts(games_fts, rowid, search_name) VALUES ('delete', old.id, old.search_name);
+            INSERT INTO games_fts(rowid, search_name) VALUES (new.id, new.search_name);
+        END''')
+        has_fts = '1'
+    except OperationalError:
+        has_fts = '0'
+    cursor.execute("INSERT INTO meta VALUES ('source', ?)", (get_catalog_fingerprint(catalog_file),))
+    cursor.execute("INSERT INTO meta VALUES ('fts', ?)", (has_fts,))
+    build_fuzzy_index(cursor)
+    cursor.execute(f'PRAGMA user_version = {DB_SCHEMA_VERSION}')
     conn.commit()
-    return conn
 
-def search_game_by_name(conn, name_pattern):
-    cursor = conn.cursor()
-    cursor.execute("""
-        SELECT name, link, code, regions 
-        FROM games
-        WHERE name LIKE ?
-        ORDER BY name
-    """, (f'%{name_pattern}%',))
-    results = cursor.fetchall()
+def is_games_db_current(conn, catalog_file=CATALOG_FILE):
+    from sqlite3 import DatabaseError
+    try:
+        if conn.execute('PRAGMA user_version').fetchone()[0] != DB_SCHEMA_VERSION:
+            return False
+        row = conn.execute("SELECT value FROM meta WHERE key = 'source'").fetchone()
+    except DatabaseError:
+        return False
+    return row is not None and row[0] == get_catalog_fingerprint(catalog_file)
+
+def load_games_to_db(db_file=DB_FILE, catalog_file=CATALOG_FILE, json_file=JSON_FILE):
+    from sqlite3 import connect, DatabaseError
+    with stage('db.load'):
+        ensure_catalog(catalog_file, json_file)
+        conn = connect(db_file, timeout=DB_LOCK_TIMEOUT)
+        if is_games_db_current(conn, catalog_file):
+            return conn
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+        except DatabaseError:
+            conn.close()
+            if not path.exists(db_file) or is_sqlite_file(db_file):
+                raise
+            remove(db_file)
+            conn = connect(db_file, timeout=DB_LOCK_TIMEOUT)
+            conn.execute('BEGIN IMMEDIATE')
+        try:
+            if is_games_db_current(conn, catalog_file):
+                conn.commit()
+                return conn
+            with stage('db.build'):
+                if not path.exists(catalog_file):
+                    fill_games_db(conn, [], catalog_file)
+                else:
+                    with Catalog(catalog_file) as catalog:
+                        fill_games_db(conn, catalog, catalog_file)
+        except BaseException:
+            conn.rollback()
+            conn.close()
+            raise
+        return conn
+
+def is_sqlite_file(db_file):
+    with open(db_file, 'rb') as f:
+        header = f.read(16)
+    return not header or header == b'SQLite format 3\0'
+
+def game_key(game):
+    return (game.get('code', 'Unknown'), game.get('link', ''))
+
+def load_previous_catalog(conn):
+    previous = {}
+    for game_id, name, link, code, region_mask in conn.execute("SELECT id, name, link, code, region_mask FROM games ORDER BY id"):
+        previous.setdefault((code, link), []).append((game_id, name, region_mask))
+    return previous
+
+class GamesDelta:
+    def __init__(self, cursor):
+        self.cursor = cursor
+        self.last_id = cursor.execute("SELECT COALESCE(MAX(id), 0) FROM games").fetchone()[0]
+        self.added = []
+        self.changed = []
+        self.old_names = []
+        self.new_names = []
+        self.counts = {'added': 0, 'removed': 0, 'changed': 0}
+
+    def __bool__(self):
+        return any(self.counts.values()) or bool(self.added or self.changed)
+
+    def add(self, game):
+        self.added.append(game_to_row(game))
+        if len(self.added) >= DB_BATCH_SIZE:
+            self.flush()
+
+    def change(self, game_id, game):
+        self.changed.append((*game_to_row(game), game_id))
+        if len(self.changed) >= DB_BATCH_SIZE:
+            self.flush()
+
+    def remove(self, game_ids):
+        self.old_names += select_by_ids(self.cursor, "SELECT id, search_name FROM games WHERE id IN ({})", game_ids)
+        for batch in batched((game_id,) for game_id in game_ids):
+            self.cursor.executemany("DELETE FROM games WHERE id = ?", batch)
+        self.counts['removed'] += len(game_ids)
+
+    def flush(self):
+        if self.changed:
+            self.old_names += select_by_ids(self.cursor, "SELECT id, search_name FROM games WHERE id IN ({})", [row[-1] for row in self.changed])
+            self.new_names += [(row[-1], row[1]) for row in self.changed]
+            self.cursor.executemany("UPDATE games SET name = ?, search_name = ?, link = ?, code = ?, region_mask = ?, base_id = ? WHERE id = ?", self.changed)
+            self.counts['changed'] += len(self.changed)
+            self.changed = []
+        if self.added:
+            self.cursor.executemany("INSERT INTO games (name, search_name, link, code, region_mask, base_id) VALUES (?, ?, ?, ?, ?, ?)", self.added)
+            self.counts['added'] += len(self.added)
+            self.added = []
+
+    def commit(self, catalog_file=CATALOG_FILE):
+        self.flush()
+        if self.last_id == 0:
+            build_fuzzy_index(self.cursor)
+        else:
+            added_names = self.cursor.connection.execute("SELECT id, search_name FROM games WHERE id > ?", (self.last_id,))
+            update_fuzzy_index(self.cursor, self.old_names, chain(self.new_names, added_names))
+        self.cursor.execute("UPDATE meta SET value = ? WHERE key = 'source'", (get_catalog_fingerprint(catalog_file),))
+        self.cursor.connection.commit()
+
+def diff_games(previous, games, delta):
+    for game in games:
+        key = game_key(game)
+        entries = previous.get(key)
+        if not entries:
+            delta.add(game)
+        else:
+            game_id, name, region_mask = entries.pop(0)
+            if not entries:
+                del previous[key]
+            if name != game.get('name', '') or region_mask != encode_regions(game.get('regions', ['Unknown'])):
+                delta.change(game_id, game)
+        yield game
+    delta.remove([game_id for entries in previous.values() for game_id, _, _ in entries])
+
+def update_games_catalog(games, db_file=DB_FILE, catalog_file=CATALOG_FILE, json_file=JSON_FILE, us_json_file=US_JSON_FILE):
+    conn = load_games_to_db(db_file, catalog_file, json_file)
+    try:
+        previous = load_previous_catalog(conn)
+        conn.execute('BEGIN IMMEDIATE')
+        delta = GamesDelta(conn.cursor())
+        with stage('catalog.diff'):
+            sections = pack_catalog(diff_games(previous, games, delta))
+        written = bool(delta) or not all(path.exists(file) for file in (catalog_file, json_file, us_json_file))
+        if written:
+            with stage('catalog.write'):
+                save_catalog(sections, catalog_file)
+            with stage('json.export'), Catalog(catalog_file) as catalog:
+                export_catalog_json(catalog, json_file)
+                export_catalog_json(catalog, us_json_file, us_only=True)
+            with stage('db.apply'):
+                delta.commit(catalog_file)
+        else:
+            conn.rollback()
+    except BaseException:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+    return {**delta.counts, 'written': written}
+
+def has_search_index(conn):
+    row = conn.execute("SELECT value FROM meta WHERE key = 'fts'").fetchone()
+    return row is not None and row[0] == '1'
+
+def escape_like(term):
+    return term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+def search_game_by_name(conn, name_pattern, limit=SEARCH_LIMIT, offset=0):
+    tokens = fold_name(name_pattern).split()
+    use_index = has_search_index(conn)
+    match_tokens = [token for token in tokens if use_index and len(token) >= 3]
+    like_tokens = [token for token in tokens if token not in match_tokens]
+    conditions = []
+    params = []
+    if match_tokens:
+        conditions.append("games_fts MATCH ?")
+        params.append(' AND '.join('"' + token.replace('"', '""') + '"' for token in match_tokens))
+    for token in like_tokens:
+        conditions.append("games.search_name LIKE ? ESCAPE '\\'")
+        params.append(f'%{escape_like(token)}%')
+    prefix = f'{escape_like(tokens[0])}%' if tokens else '%'
+    with stage('search.query'):
+        cursor = conn.cursor()
+        if match_tokens:
+            query = f"""
+                SELECT games.name, games.link, games.code, games.region_mask
+                FROM games_fts
+                JOIN games ON games.id = games_fts.rowid
+                WHERE {' AND '.join(conditions)}
+                ORDER BY games.search_name LIKE ? ESCAPE '\\' DESC, length(games.search_name), games.name
+                LIMIT ? OFFSET ?
+            """
+        else:
+            query = f"""
+                SELECT name, link, code, region_mask
+                FROM games
+                WHERE {' AND '.join(conditions) or '1'}
+                ORDER BY search_name LIKE ? ESCAPE '\\' DESC, length(search_name), name
+                LIMIT ? OFFSET ?
+            """
+        cursor.execute(query, (*params, prefix, limit or -1, offset))
+        results = cursor.fetchall()
+    count('search.results', len(results))
     return [
         {
             'name': row[0],
             'link': row[1],
             'code': row[2],
-            'regions': loads(row[3])
+            'regions': decode_regions(row[3])
         }
         for row in results
     ]
 
-def parse_file_info(filename):
-    info = {
-        "type": "Unknown",
-        "format": "Unknown",
-        "version": "Unknown",
-        "region": "Unknown"
-    }
-    lower_name = filename.lower()
-    if ".nsp" in lower_name:
-        info["format"] = "NSP"
-    elif ".xci" in lower_name:
-        info["format"] = "XCI"
-    elif ".rar" in lower_name or ".zip" in lower_name:
-        if ".nsp" in lower_name:
-            info["format"] = "NSP (archived)"
-        elif ".xci" in lower_name:
-            info["format"] = "XCI (archived)"
+def lookup_codes(conn, codes):
+    requested = {}
+    for code in codes:
+        code = code.strip()
+        if compiled(TITLE_ID_PATTERN).fullmatch(code):
+            requested[code] = int(code, 16)
+    base_ids = list(dict.fromkeys(title_base_id(title_id) for title_id in requested.values() if title_id < 1 << 63))
+    with stage('search.codes'):
+        rows = select_by_ids(conn, "SELECT name, link, code, region_mask, base_id FROM games WHERE base_id IN ({}) ORDER BY id", base_ids)
+    groups = {}
+    for name, link, code, region_mask, base_id in rows:
+        groups.setdefault(base_id, []).append({
+            'name': name,
+            'link': link,
+            'code': code,
+            'regions': decode_regions(region_mask),
+            'kind': title_kind(encode_code(code))
+        })
+    count('search.codes', len(codes))
+    results = []
+    for code in codes:
+        title_id = requested.get(code.strip())
+        if title_id is None:
+            results.append({'code': code, 'error': "Invalid title ID"})
+            continue
+        base_id = title_base_id(title_id)
+        games = groups.get(base_id, [])
+        results.append({
+            'code': decode_code(title_id),
+            'base': decode_code(base_id),
+            'kind': title_kind(title_id),
+            'matches': [game for game in games if game['code'].upper() == decode_code(title_id)],
+            'group': games
+        })
+    return results
+
+def fuzzy_tokens(search_name):
+    return compiled(FUZZY_TOKEN_PATTERN).findall(compiled(FUZZY_STRIP_PATTERN).sub(' ', search_name))
+
+def term_grams(term, size=FUZZY_GRAM_SIZE):
+    padded = f" {term} "
+    return {padded[i:i + size] for i in range(max(1, len(padded) - size + 1))}
+
+def max_edits(term):
+    if len(term) <= 2:
+        return 0
+    if len(term) <= 5:
+        return 1
+    return 2
+
+def edit_distance(a, b, limit):
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    before, previous = None, list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            distance = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b))
+            if i > 1 and j > 1 and char_a == b[j - 2] and a[i - 2] == char_b:
+                distance = min(distance, before[j - 2] + 1)
+            current.append(distance)
+        if min(current) > limit:
+            return limit + 1
+        before, previous = previous, current
+    return previous[-1]
+
+def pack_ids(ids):
+    column = array('I', ids)
+    if byteorder == 'big':
+        column.byteswap()
+    return column.tobytes()
+
+def unpack_ids(data):
+    column = array('I')
+    column.frombytes(data)
+    if byteorder == 'big':
+        column.byteswap()
+    return column
+
+def build_fuzzy_index(cursor):
+    with stage('db.fuzzy_index'):
+        cursor.execute('DELETE FROM fuzzy_terms')
+        cursor.execute('DELETE FROM fuzzy_grams')
+        postings = {}
+        for game_id, search_name in cursor.execute('SELECT id, search_name FROM games ORDER BY id').fetchall():
+            for token in set(fuzzy_tokens(search_name)):
+                postings.setdefault(token, []).append(game_id)
+        grams = {}
+        for term_id, term in enumerate(postings, 1):
+            for gram in term_grams(term):
+                grams.setdefault(gram, []).append(term_id)
+        terms = ((term_id, term, pack_ids(game_ids)) for term_id, (term, game_ids) in enumerate(postings.items(), 1))
+        for batch in batched(terms):
+            cursor.executemany("INSERT INTO fuzzy_terms VALUES (?, ?, ?)", batch)
+        for batch in batched((gram, pack_ids(term_ids)) for gram, term_ids in grams.items()):
+            cursor.executemany("INSERT INTO fuzzy_grams VALUES (?, ?)", batch)
+
+def update_fuzzy_index(cursor, old_names, new_names):
+    with stage('db.fuzzy_index'):
+        postings = {}
+        for present, names in ((False, old_names), (True, new_names)):
+            for game_id, search_name in names:
+                for token in set(fuzzy_tokens(search_name)):
+                    postings.setdefault(token, {})[game_id] = present
+        terms = {term: (term_id, games) for term_id, term, games in select_by_ids(cursor, "SELECT id, term, games FROM fuzzy_terms WHERE term IN ({})", list(postings))}
+        grams = {}
+        for term, changes in postings.items():
+            term_id, games = terms.get(term, (None, b''))
+            game_ids = set(unpack_ids(games))
+            game_ids.difference_update(game_id for game_id, present in changes.items() if not present)
+            game_ids.update(game_id for game_id, present in changes.items() if present)
+            if term_id is not None and game_ids:
+                cursor.execute("UPDATE fuzzy_terms SET games = ? WHERE id = ?", (pack_ids(sorted(game_ids)), term_id))
+                continue
+            if term_id is not None:
+                cursor.execute("DELETE FROM fuzzy_terms WHERE id = ?", (term_id,))
+            elif game_ids:
+                cursor.execute("INSERT INTO fuzzy_terms (term, games) VALUES (?, ?)", (term, pack_ids(sorted(game_ids))))
+                term_id = cursor.lastrowid
+            else:
+                continue
+            for gram in term_grams(term):
+                grams.setdefault(gram, {})[term_id] = bool(game_ids)
+        rows = dict(select_by_ids(cursor, "SELECT gram, terms FROM fuzzy_grams WHERE gram IN ({})", list(grams)))
+        for gram, changes in grams.items():
+            term_ids = set(unpack_ids(rows.get(gram, b'')))
+            term_ids.difference_update(term_id for term_id, present in changes.items() if not present)
+            term_ids.update(term_id for term_id, present in changes.items() if present)
+            if term_ids:
+                cursor.execute("INSERT OR REPLACE INTO fuzzy_grams VALUES (?, ?)", (gram, pack_ids(sorted(term_ids))))
+            else:
+                cursor.execute("DELETE FROM fuzzy_grams WHERE gram = ?", (gram,))
+
+def select_by_ids(conn, query, ids):
+    rows = []
+    for batch in batched(ids):
+        rows += conn.execute(query.format(', '.join('?' * len(batch))), batch).fetchall()
+    return rows
+
+def match_fuzzy_terms(conn, token):
+    grams = term_grams(token)
+    shared = {}
+    for (term_ids,) in select_by_ids(conn, "SELECT terms FROM fuzzy_grams WHERE gram IN ({})", list(grams)):
+        for term_id in unpack_ids(term_ids):
+            shared[term_id] = shared.get(term_id, 0) + 1
+    edits = max_edits(token)
+    threshold = max(1, min(len(grams) - (FUZZY_GRAM_SIZE + 1) * edits, len(grams) - 1))
+    candidates = [term_id for term_id, hits in shared.items() if hits >= threshold]
+    matches = {}
+    for term_id, term in select_by_ids(conn, "SELECT id, term FROM fuzzy_terms WHERE id IN ({})", candidates):
+        if term == token:
+            matches[term_id] = 1.0
+        elif len(token) >= 3 and term.startswith(token):
+            matches[term_id] = 0.5 + 0.4 * len(token) / len(term)
         else:
-            info["format"] = "Archive"
-    if "update" in lower_name or "[v" in lower_name or "patch" in lower_name or any(x in lower_name for x in ["[v", "(v", "+v", "+update"]):
-        info["type"] = "Update"
-    elif "dlc" in lower_name or "addon" in lower_name:
-        info["type"] = "DLC"
-    else:
-        info["type"] = "Base Game"
-    version_patterns = [
-        r'\[v(\d+\.?\d*(?:\.\d+)*)\]',  # [v1.2.3]
-        r'\(v(\d+\.?\d*(?:\.\d+)*)\)',  # (v1.2.3)
-        r'v(\d+\.?\d*(?:\.\d+)*)',       # v1.2.3
-        r'\[(\d+\.?\d+(?:\.\d+)*)\]',   # [1.2.3]
-        r'\((\d+\.?\d+(?:\.\d+)*)\)',   # (1.2.3)
-        r'\[v?(\d+)\]',                 # [65536] or [v65536]
-        r'\bv(\d+\.?\d*(?:\.\d+)*)\b',  # v1.2.3 (with word boundary)
-    ]
-    for pattern in version_patterns:
-        version_match = search(pattern, filename)
-        if version_match:
-            version = version_match.group(1)
-            if version.isdigit() and len(version) >= 5:
-                num_version = int(version)
-                major = num_version >> 16
-                minor = (num_version >> 8) & 0xFF
-                patch = num_version & 0xFF
-                if major > 0:
-                    version = f"{major}.{minor}.{patch}"
-            info["version"] = version
+            distance = edit_distance(token, term, edits)
+            if distance <= edits:
+                matches[term_id] = 1 - distance / max(len(token), len(term))
+    return matches
+
+def rank_fuzzy_matches(options, limit):
+    start = (0,) * len(options)
+    heap = [(-sum(token_options[0][0] for token_options in options), start)]
+    seen = {start}
+    scores = {}
+    cutoff = None
+    candidates = max(FUZZY_CANDIDATES, limit)
+    while heap and len(scores) < candidates:
+        total, combination = heappop(heap)
+        if total >= 0 or (cutoff is not None and -total < cutoff):
             break
-    region_patterns = {
-        r'\[US\]|\(US\)|USA': 'US',
-        r'\[EU\]|\(EU\)|EUR|Europe': 'EU', 
-        r'\[JP\]|\(JP\)|JPN|Japan': 'JP',
-        r'\[AS\]|\(AS\)|ASIA': 'AS',
-        r'\[ALL\]|\(ALL\)|WW|World': 'ALL',
-        r'\[KOR\]|\(KOR\)|Korea': 'KOR',
-        r'\[CHN\]|\(CHN\)|China': 'CHN',
-    }
-    regions_found = []
-    for pattern, region in region_patterns.items():
-        if search(pattern, filename, IGNORECASE):
-            regions_found.append(region)
-    if regions_found:
-        info["region"] = ",".join(regions_found)
-    return info
+        sets = sorted((options[i][choice][1] for i, choice in enumerate(combination) if options[i][choice][1] is not None), key=len)
+        for game_id in sets[0].intersection(*sets[1:]):
+            if game_id not in scores:
+                scores[game_id] = -total / len(options)
+                if len(scores) >= candidates:
+                    break
+        if cutoff is None and len(scores) >= limit:
+            cutoff = -total
+        for i, choice in enumerate(combination):
+            if choice + 1 < len(options[i]):
+                successor = combination[:i] + (choice + 1,) + combination[i + 1:]
+                if successor not in seen:
+                    seen.add(successor)
+                    heappush(heap, (total + options[i][choice][0] - options[i][choice + 1][0], successor))
+    return scores
+
+def fuzzy_search_games(conn, query, limit=FUZZY_LIMIT, offset=0):
+    tokens = list(dict.fromkeys(fuzzy_tokens(fold_name(query))))
+    if not tokens:
+        return []
+    with stage('search.fuzzy'):
+        options = []
+        for token in tokens:
+            matches = match_fuzzy_terms(conn, token)
+            rows = select_by_ids(conn, "SELECT id, games FROM fuzzy_terms WHERE id IN ({})", list(matches))
+            token_options = sorted(((matches[term_id], set(unpack_ids(games))) for term_id, games in rows), key=lambda option: -option[0])
+            options.append(token_options + [(0, None)])
+        scores = rank_fuzzy_matches(options, limit + offset)
+        rows = select_by_ids(conn, "SELECT id, name, link, code, region_mask FROM games WHERE id IN ({})", list(scores))
+    rows.sort(key=lambda row: (-scores[row[0]], len(row[1]), row[1]))
+    rows = rows[offset:offset + limit]
+    count('search.results', len(rows))
+    return [
+        {
+            'name': name,
+            'link': link,
+            'code': code,
+            'regions': decode_regions(region_mask),
+            'score': round(scores[game_id], 3)
+        }
+        for game_id, name, link, code, region_mask in rows
+    ]
+
+def parse_file_info(filename):
+    return get_classifier().parse_file_info(filename)
 
 def decode_redirect_url(redirect_url):
+    from base64 import b64decode
+    from urllib.parse import urlparse, parse_qs
     try:
         parsed_url = urlparse(redirect_url)
         if 'redirect-to' in parsed_url.path or 'redirect' in parsed_url.path:
@@ -351,77 +1750,389 @@ def decode_redirect_url(redirect_url):
     except Exception as e:
         return redirect_url
 
-def get_download_links(game_url):
-    download_links = []
+def parse_detail_page(html):
+    parser = html_parser_classes()['DetailPageParser']()
+    parser.feed(html)
+    parser.close()
     detailed_links = []
+    for section, cells in parser.rows:
+        category = cells[0][0].strip()
+        filename = cells[1][0].strip()
+        file_info = parse_file_info(filename)
+        if category.lower() in ["base", "update", "dlc", "old update"]:
+            file_info["type"] = category
+        for link_url, link_text in cells[2][1]:
+            detailed_links.append((filename, link_url, file_info, link_text))
+    if detailed_links:
+        return detailed_links
+    download_links = parser.download_links
+    if not download_links:
+        print("No structured download tables found, trying alternative methods...", file=stderr)
+        for link in compiled(FILE_LINK_PATTERN, IGNORECASE).findall(html) + compiled(REDIRECT_LINK_PATTERN, IGNORECASE).findall(html):
+            filename = path.basename(link.split('?')[0])
+            if not filename:
+                filename = "Download Link"
+            download_links.append((filename, link))
+    for filename, link_url in download_links:
+        info = parse_file_info(filename)
+        detailed_links.append((filename, link_url, info, "Download"))
+    return detailed_links
+
+def fetch_download_links(game_url, timeout=REQUEST_TIMEOUT, max_age=None):
+    if not game_url:
+        raise ValueError("Invalid game URL")
+    cache = get_link_cache()
+    with stage('links.cache'):
+        detailed_links = cache.get(game_url, max_age)
+    if detailed_links is not None:
+        count('links.cache_hits')
+        return detailed_links
+    with stage('links.fetch'):
+        stream, modified = open_url(game_url, max_age, timeout)
+        with stream:
+            if not modified:
+                detailed_links = cache.get(game_url, refresh=True)
+                if detailed_links is not None:
+                    count('links.not_modified')
+                    return detailed_links
+            html = stream.read().decode('utf-8')
+    with stage('links.parse'):
+        detailed_links = parse_detail_page(html)
+    count('links.found', len(detailed_links))
+    if detailed_links:
+        cache.store(game_url, detailed_links)
+    else:
+        cache.invalidate(game_url)
+    return detailed_links
+
+def get_download_links(game_url, max_age=None):
     try:
-        if not game_url:
-            raise ValueError("Invalid game URL")
-        headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'}
-        req = Request(game_url, headers=headers)
-        with urlopen(req) as response:
-            html = response.read().decode('utf-8')
-            download_box_pattern = compile(r'<div\s+class=[\'"]download-box[\'"]>(.*?)</div>', IGNORECASE | DOTALL)
-            download_boxes = download_box_pattern.findall(html)
-            if download_boxes:
-                for box_content in download_boxes:
-                    table_pattern = compile(r'<table\s+class=[\'"]bti-table[\'"].*?<tbody>(.*?)</tbody>', IGNORECASE | DOTALL)
-                    tables = table_pattern.findall(box_content)
-                    section_headers = findall(r'<h4>(.*?)</h4>', box_content)
-                    section_idx = 0
-                    for table in tables:
-                        if section_idx < len(section_headers):
-                            section_idx += 1
-                        row_pattern = compile(r'<tr>(.*?)</tr>', IGNORECASE | DOTALL)
-                        rows = row_pattern.findall(table)
-                        for row in rows:
-                            if '<th>' in row:
-                                continue
-                            try:
-                                cell_pattern = compile(r'<td>(.*?)</td>', IGNORECASE | DOTALL)
-                                cells = cell_pattern.findall(row)
-                                if len(cells) >= 3:
-                                    category = cells[0].strip()
-                                    filename = cells[1].strip()
-                                    link_cell = cells[2]
-                                    filename = sub(r'<[^>]*>', '', filename).strip()
-                                    links_pattern = compile(r'<a\s+href=[\'"]([^\'"]+)[\'"][^>]*>([^<]+)</a>', IGNORECASE)
-                                    links = links_pattern.findall(link_cell)
-                                    file_info = parse_file_info(filename)
-                                    if category.lower() in ["base", "update", "dlc", "old update"]:
-                                        file_info["type"] = category
-                                    for link_url, link_text in links:
-                                        detailed_links.append((filename, link_url, file_info, link_text))
-                            except Exception as e:
-                                print(f"Error parsing row: {e}")
-            if not detailed_links:
-                parser = DownloadLinkParser()
-                parser.feed(html)
-                download_links = parser.download_links
-                if not download_links:
-                    print("No structured download tables found, trying alternative methods...")
-                    nsp_links = findall(r'href=[\'"]?([^\'" >]+\.(?:nsp|xci|rar|zip)[^\'" >]*)', html, IGNORECASE)
-                    redirect_links = findall(r'href=[\'"]?([^\'" >]*redirect-to[^\'" >]*)', html, IGNORECASE)
-                    for link in nsp_links + redirect_links:
-                        filename = path.basename(link.split('?')[0])
-                        if not filename:
-                            filename = "Download Link"
-                        download_links.append((filename, link))
-                for filename, link_url in download_links:
-                    info = parse_file_info(filename)
-                    detailed_links.append((filename, link_url, info, "Download"))
+        return fetch_download_links(game_url, max_age=max_age)
     except Exception as e:
         print(f"Error fetching download links: {e}")
         import traceback
         traceback.print_exc()
-    return detailed_links
+    return []
 
-if __name__ == "__main__":
-    if not path.exists(JSON_FILE) or not path.exists(US_JSON_FILE):
+def is_retryable_error(error):
+    from urllib.error import HTTPError
+    if isinstance(error, HTTPError):
+        return error.code == 429 or error.code >= 500
+    return isinstance(error, OSError)
+
+def resolve_download_links(game_urls, workers=BATCH_WORKERS, per_host=BATCH_PER_HOST, retries=BATCH_RETRIES, backoff=BATCH_BACKOFF, timeout=REQUEST_TIMEOUT, max_age=None):
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+    from urllib.parse import urlparse
+    host_limits = {}
+    host_limits_lock = Lock()
+
+    def host_limit(game_url):
+        host = urlparse(game_url).netloc
+        with host_limits_lock:
+            if host not in host_limits:
+                host_limits[host] = BoundedSemaphore(per_host)
+            return host_limits[host]
+
+    def resolve(game_url):
+        for attempt in range(retries + 1):
+            try:
+                with host_limit(game_url):
+                    return game_url, fetch_download_links(game_url, timeout, max_age), None
+            except Exception as e:
+                if attempt == retries or not is_retryable_error(e):
+                    return game_url, [], e
+            sleep(backoff * 2 ** attempt)
+
+    executor = ThreadPoolExecutor(max_workers=workers)
+    try:
+        futures = [executor.submit(resolve, game_url) for game_url in game_urls]
+        for future in as_completed(futures):
+            yield future.result()
+    finally:
+        executor.shutdown(cancel_futures=True)
+
+class LatencyRecorder:
+    def __init__(self, window=LATENCY_WINDOW):
+        self.window = window
+        self.lock = Lock()
+        self.samples = {}
+        self.counts = {}
+
+    def record(self, endpoint, elapsed):
+        with self.lock:
+            if endpoint not in self.samples:
+                self.samples[endpoint] = deque(maxlen=self.window)
+            self.samples[endpoint].append(elapsed)
+            self.counts[endpoint] = self.counts.get(endpoint, 0) + 1
+
+    def percentiles(self):
+        with self.lock:
+            samples = {endpoint: sorted(values) for endpoint, values in self.samples.items()}
+            counts = dict(self.counts)
+        report = {}
+        for endpoint, values in samples.items():
+            report[endpoint] = {'requests': counts[endpoint]}
+            for label, fraction in (('p50', 0.5), ('p90', 0.9), ('p99', 0.99)):
+                report[endpoint][f'{label}_ms'] = values[min(len(values) - 1, int(fraction * len(values)))] * 1000
+            report[endpoint]['max_ms'] = values[-1] * 1000
+        return report
+
+class CatalogService:
+    def __init__(self, db_file=DB_FILE, catalog_file=CATALOG_FILE, json_file=JSON_FILE):
+        self.db_file = db_file
+        self.catalog_file = catalog_file
+        self.json_file = json_file
+        self.lock = Lock()
+        self.readers = local()
+        self.fingerprint = None
+        self.loaded_at = None
+        self.reloads = 0
+        self.reload()
+
+    def current_fingerprint(self):
+        return get_catalog_fingerprint(self.catalog_file)
+
+    def reload(self):
+        fingerprint = self.current_fingerprint()
+        load_games_to_db(self.db_file, self.catalog_file, self.json_file).close()
+        with self.lock:
+            self.fingerprint = fingerprint
+            self.loaded_at = time()
+            self.reloads += 1
+
+    def connection(self):
+        from sqlite3 import connect
+        from urllib.parse import quote
+        fingerprint = self.fingerprint
+        readers = self.readers
+        if getattr(readers, 'fingerprint', None) != fingerprint:
+            self.close()
+            readers.conn = connect(f"file:{quote(path.abspath(self.db_file))}?mode=ro", uri=True, timeout=DB_LOCK_TIMEOUT)
+            readers.fingerprint = fingerprint
+        return readers.conn
+
+    def reload_if_changed(self):
+        if self.current_fingerprint() != self.fingerprint:
+            self.reload()
+            return True
+        return False
+
+    def watch(self, interval, stop_event):
+        while not stop_event.wait(interval):
+            try:
+                if self.reload_if_changed():
+                    print("Catalog changed on disk, reloaded.", file=stderr)
+            except Exception as e:
+                print(f"Error reloading catalog: {e}", file=stderr)
+
+    def search(self, query, fuzzy=False, limit=SEARCH_LIMIT, offset=0):
+        if fuzzy:
+            return fuzzy_search_games(self.connection(), query, limit or FUZZY_LIMIT, offset)
+        return search_game_by_name(self.connection(), query, limit, offset)
+
+    def lookup_codes(self, codes):
+        return lookup_codes(self.connection(), codes)
+
+    def stats(self):
+        games = self.connection().execute("SELECT COUNT(*) FROM games").fetchone()[0]
+        with self.lock:
+            return {'games': games, 'loaded_at': self.loaded_at, 'reloads': self.reloads}
+
+    def close(self):
+        conn = getattr(self.readers, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self.readers.conn = None
+            self.readers.fingerprint = None
+
+def query_param(params, name, default=None):
+    values = params.get(name)
+    if not values:
+        if default is None:
+            raise ValueError(f"Missing query parameter: {name}")
+        return default
+    return values[0]
+
+def serve_search(server, params):
+    query = query_param(params, 'q')
+    limit = int(query_param(params, 'limit', str(SEARCH_LIMIT)))
+    offset = int(query_param(params, 'offset', '0'))
+    fuzzy = query_param(params, 'fuzzy', '0') == '1'
+    results = server.service.search(query, fuzzy, limit, offset)
+    return {'query': query, 'offset': offset, 'count': len(results), 'results': results}
+
+def serve_codes(server, params):
+    codes = [code for value in params.get('id', []) for code in value.split(',') if code]
+    if not codes:
+        raise ValueError("Missing query parameter: id")
+    return {'results': server.service.lookup_codes(codes)}
+
+def serve_links(server, params):
+    game_url = query_param(params, 'url')
+    include_old = query_param(params, 'all', '0') == '1'
+    max_age = 0 if query_param(params, 'refresh', '0') == '1' else None
+    try:
+        download_links = fetch_download_links(game_url, max_age=max_age)
+    except Exception as e:
+        return {'url': game_url, 'links': [], 'error': str(e)}
+    return {'url': game_url, 'links': download_link_records(download_links, include_old), 'error': None}
+
+def serve_stats(server, params):
+    stats = {
+        'catalog': server.service.stats(),
+        'latency': server.latency.percentiles(),
+    }
+    if http_session is not None:
+        stats['http'] = dict(http_session.counters)
+    return stats
+
+SERVE_ROUTES = {
+    '/search': serve_search,
+    '/codes': serve_codes,
+    '/links': serve_links,
+    '/stats': serve_stats,
+}
+
+@lru_cache(maxsize=None)
+def serve_classes():
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    from socketserver import ThreadingMixIn, UnixStreamServer
+
+    class ServeRequestHandler(BaseHTTPRequestHandler):
+        server_version = 'switch-cfw-dl'
+        protocol_version = 'HTTP/1.1'
+
+        def do_GET(self):
+            from urllib.parse import urlparse, parse_qs
+            start = perf_counter()
+            parsed_url = urlparse(self.path)
+            route = SERVE_ROUTES.get(parsed_url.path)
+            if route is None:
+                status, body = 404, {'error': f"Unknown endpoint: {parsed_url.path}"}
+            else:
+                try:
+                    status, body = 200, route(self.server, parse_qs(parsed_url.query))
+                except ValueError as e:
+                    status, body = 400, {'error': str(e)}
+                except Exception as e:
+                    status, body = 500, {'error': str(e)}
+            data = dumps(body, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+            self.server.latency.record(parsed_url.path if route is not None else 'unknown', perf_counter() - start)
+
+        def address_string(self):
+            return self.client_address[0] if isinstance(self.client_address, tuple) else 'unix'
+
+        def log_message(self, format, *args):
+            if self.server.verbose:
+                super().log_message(format, *args)
+
+    class CatalogUnixServer(ThreadingMixIn, UnixStreamServer):
+        daemon_threads = True
+
+    return {'ServeRequestHandler': ServeRequestHandler, 'CatalogHTTPServer': ThreadingHTTPServer, 'CatalogUnixServer': CatalogUnixServer}
+
+def serve_catalog(host=SERVE_HOST, port=SERVE_PORT, socket_path=None, reload_interval=SERVE_RELOAD_INTERVAL, verbose=False):
+    classes = serve_classes()
+    service = CatalogService()
+    handler = classes['ServeRequestHandler']
+    if socket_path:
+        if path.exists(socket_path):
+            remove(socket_path)
+        server = classes['CatalogUnixServer'](socket_path, handler)
+        address = socket_path
+    else:
+        server = classes['CatalogHTTPServer']((host, port), handler)
+        address = f"http://{server.server_address[0]}:{server.server_address[1]}"
+    server.service = service
+    server.latency = LatencyRecorder()
+    server.verbose = verbose
+    stop_event = Event()
+    watcher = Thread(target=service.watch, args=(reload_interval, stop_event), daemon=True)
+    watcher.start()
+    print(f"Serving the games catalog on {address}", file=stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop_event.set()
+        server.server_close()
+        service.close()
+        if socket_path and path.exists(socket_path):
+            remove(socket_path)
+    return 0
+
+def skip_old_updates(download_links):
+    for download_link in download_links:
+        if download_link[2]["type"].lower() != "old update":
+            yield download_link
+
+def decode_download_links(download_links):
+    for filename, link_url, info, link_text in download_links:
+        yield {
+            'filename': filename,
+            'url': decode_redirect_url(link_url),
+            'link': link_url,
+            'text': link_text,
+            **info
+        }
+
+def dedupe_download_records(records):
+    seen = set()
+    for record in records:
+        key = (record['filename'], record['type'], record['url'])
+        if key not in seen:
+            seen.add(key)
+            yield record
+
+def iter_download_records(download_links, include_old=False):
+    if not include_old:
+        download_links = skip_old_updates(download_links)
+    return dedupe_download_records(decode_download_links(download_links))
+
+def group_download_records(records):
+    groups = {}
+    for record in records:
+        key = (record['filename'], record['type'], record['format'], record['version'], record['region'])
+        groups.setdefault(key, []).append(record)
+    yield from groups.items()
+
+def download_link_records(download_links, include_old=False):
+    return list(iter_download_records(download_links, include_old))
+
+def print_download_links(download_links):
+    if not download_links:
+        print("No download links found.")
+        return
+    print("\nDownload Links:")
+    for i, ((filename, type_info, format_info, version_info, region_info), records) in enumerate(group_download_records(iter_download_records(download_links)), 1):
+        print(f"{i}. {type_info} - {filename}")
+        for record in records:
+            print(f" {record['text']} {record['url']}")
+        print()
+
+def print_batch_download_links(game_urls):
+    print(f"\nResolving download links for {len(game_urls)} games, please wait...")
+    for game_url, download_links, error in resolve_download_links(game_urls):
+        print(f"\n== {game_url}")
+        if error is not None:
+            print(f"Error fetching download links: {error}")
+        else:
+            print_download_links(download_links)
+
+def run_menu():
+    if not path.exists(CATALOG_FILE) and not path.exists(JSON_FILE):
         print("Games list not found. Downloading game data...")
         download_games()
+    db_conn = None
     first_run = True
     while True:
+        print_profile_report()
         if first_run:
             print("SWITCH-CFW-DL")
             first_run = False
@@ -429,48 +2140,46 @@ if __name__ == "__main__":
             print("\nSWITCH-CFW-DL")
         print("1. Update games list")
         print("2. Search game by name")
+        print("3. Resolve download links from file")
+        print("4. Export US games list")
         print("0. Exit")
         choice = input("Enter your choice: ")
         if choice == '1':
             print("Updating games list...")
-            if path.exists(JSON_FILE): remove(JSON_FILE)
-            if path.exists(US_JSON_FILE): remove(US_JSON_FILE)
-            download_games()
+            if db_conn is not None:
+                db_conn.close()
+                db_conn = None
+            download_games(max_age=0)
             print("Games list updated successfully!")
         elif choice == '2':
-            db_conn = load_games_to_db()
+            if db_conn is None:
+                db_conn = load_games_to_db()
             search_term = input("Enter game name (or part of name) to search: ")
-            results = search_game_by_name(db_conn, search_term)
+            results = search_game_by_name(db_conn, search_term, SEARCH_LIMIT + 1)
+            truncated = len(results) > SEARCH_LIMIT
+            results = results[:SEARCH_LIMIT]
+            fuzzy = not results
+            if fuzzy:
+                results = fuzzy_search_games(db_conn, search_term)
             if results:
-                print(f"\nFound {len(results)} games matching '{search_term}':")
+                if fuzzy:
+                    print(f"\nNo exact matches for '{search_term}', closest titles:")
+                else:
+                    print(f"\nFound {'more than ' if truncated else ''}{len(results)} games matching '{search_term}':")
                 for i, game in enumerate(results, 1):
                     regions_str = ', '.join(game['regions'])
                     print(f"{i}. {game['name']} ({regions_str}) ({game['code']})")
                 if len(results) > 1:
                     try:
-                        selection = int(input("\nEnter number to see game details and download links (0 to return to menu): "))
+                        selection = input("\nEnter number to see game details and download links (a for all, 0 to return to menu): ")
+                        if selection.strip().lower() == 'a':
+                            print_batch_download_links([game['link'] for game in results])
+                            continue
+                        selection = int(selection)
                         if 1 <= selection <= len(results):
                             selected_game = results[selection-1]
                             print(f"\nFetching download links, please wait...")
-                            download_links = get_download_links(selected_game['link'])
-                            if download_links:
-                                grouped_links = {}
-                                for filename, link_url, info, link_text in download_links:
-                                    if info["type"].lower() == "old update":
-                                        continue
-                                    decoded_url = decode_redirect_url(link_url)
-                                    key = (filename, info["type"], info["format"], info["version"], info["region"])
-                                    if key not in grouped_links:
-                                        grouped_links[key] = []
-                                    grouped_links[key].append((decoded_url, link_text))
-                                print("\nDownload Links:")
-                                for i, ((filename, type_info, format_info, version_info, region_info), links) in enumerate(grouped_links.items(), 1):
-                                    print(f"{i}. {type_info} - {filename}")
-                                    for j, (link_url, link_text) in enumerate(links, 1):
-                                        print(f" {link_text} {link_url}")
-                                    print()
-                            else:
-                                print("No download links found.")
+                            print_download_links(get_download_links(selected_game['link']))
                         elif selection != 0:
                             print("Invalid selection")
                     except ValueError:
@@ -478,28 +2187,161 @@ if __name__ == "__main__":
                 else:
                     selected_game = results[0]
                     print(f"Fetching download links, please wait...")
-                    download_links = get_download_links(selected_game['link'])
-                    if download_links:
-                        grouped_links = {}
-                        for filename, link_url, info, link_text in download_links:
-                            if info["type"].lower() == "old update":
-                                continue
-                            decoded_url = decode_redirect_url(link_url)
-                            key = (filename, info["type"], info["format"], info["version"], info["region"])
-                            if key not in grouped_links:
-                                grouped_links[key] = []
-                            grouped_links[key].append((decoded_url, link_text))
-                        print("\nDownload Links:")
-                        for i, ((filename, type_info, format_info, version_info, region_info), links) in enumerate(grouped_links.items(), 1):
-                            print(f"{i}. {type_info} - {filename}")
-                            for j, (link_url, link_text) in enumerate(links, 1):
-                                print(f" {link_text} {link_url}")
-                            print()
-                    else:
-                        print("No download links found.")
+                    print_download_links(get_download_links(selected_game['link']))
             else:
                 print(f"No games found matching '{search_term}'")
+        elif choice == '3':
+            file_path = input("Enter path to a file with one game URL per line: ")
+            try:
+                game_urls = read_lines(file_path)
+            except OSError as e:
+                print(f"Error reading file: {e}")
+                continue
+            print_batch_download_links(game_urls)
+        elif choice == '4':
+            if ensure_catalog():
+                with Catalog() as catalog:
+                    export_catalog_json(catalog, US_JSON_FILE, us_only=True)
+                print(f"US games list has been saved to '{US_JSON_FILE}'")
+            else:
+                print("Games list not found. Update the games list first.")
         elif choice == '0':
-            break
+            if db_conn is not None:
+                db_conn.close()
+            return 0
         else:
             print("Invalid option")
+
+def read_lines(file_path):
+    if file_path == '-':
+        return [line.strip() for line in stdin if line.strip()]
+    with open(file_path, 'r', encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip()]
+
+def write_json_line(record):
+    print(dumps(record, ensure_ascii=False, separators=(',', ':')), flush=True)
+
+def run_update(args):
+    delta = download_games(max_age=args.max_age, verbose=False, workers=args.workers)
+    if delta is None:
+        return 1
+    write_json_line(delta)
+    return 0
+
+def run_search(args):
+    queries = list(args.queries)
+    if args.file:
+        queries += read_lines(args.file)
+    elif not queries:
+        queries = read_lines('-')
+    if not ensure_catalog():
+        print("Games list not found. Run the update command first.", file=stderr)
+        return 1
+    conn = load_games_to_db()
+    try:
+        for query in queries:
+            if args.fuzzy:
+                results = fuzzy_search_games(conn, query, args.limit or FUZZY_LIMIT, args.offset)
+            else:
+                results = search_game_by_name(conn, query, args.limit, args.offset)
+            write_json_line({'query': query, 'offset': args.offset, 'count': len(results), 'results': results})
+    finally:
+        conn.close()
+    return 0
+
+def run_codes(args):
+    codes = list(args.codes)
+    if args.file:
+        codes += read_lines(args.file)
+    elif not codes:
+        codes = read_lines('-')
+    if not ensure_catalog():
+        print("Games list not found. Run the update command first.", file=stderr)
+        return 1
+    conn = load_games_to_db()
+    try:
+        results = lookup_codes(conn, codes)
+    finally:
+        conn.close()
+    for result in results:
+        write_json_line(result)
+    return 1 if any('error' in result for result in results) else 0
+
+def run_links(args):
+    game_urls = list(args.urls)
+    if args.file:
+        game_urls += read_lines(args.file)
+    elif not game_urls:
+        game_urls = read_lines('-')
+    failed = False
+    for game_url, download_links, error in resolve_download_links(game_urls, workers=args.workers, per_host=args.per_host, max_age=0 if args.refresh else None):
+        failed = failed or error is not None
+        write_json_line({
+            'url': game_url,
+            'links': download_link_records(download_links, args.all),
+            'error': None if error is None else str(error)
+        })
+    return 1 if failed else 0
+
+def run_serve(args):
+    if not ensure_catalog():
+        print("Games list not found. Run the update command first.", file=stderr)
+        return 1
+    return serve_catalog(args.host, args.port, args.socket, args.reload_interval, args.verbose)
+
+def build_arg_parser():
+    parser = ArgumentParser(prog='switch_cfw_dl', description="Search the Nintendo Switch game catalog and resolve download links. Without a command, starts the interactive menu.")
+    parser.add_argument('--profile', action='store_true', help="print a per-stage timing breakdown to stderr")
+    parser.add_argument('--profile-capture', metavar='DIR', help="write cProfile and tracemalloc reports to DIR")
+    subparsers = parser.add_subparsers(dest='command')
+    update_parser = subparsers.add_parser('update', help="update the games catalog and print the changes as JSON")
+    update_parser.add_argument('--max-age', type=float, default=0, help="reuse a cached index page younger than this many seconds")
+    update_parser.add_argument('--workers', type=int, default=CLASSIFY_WORKERS, help=f"classify in this many processes once more than {CLASSIFY_PARALLEL_THRESHOLD} games are seen (1 disables)")
+    search_parser = subparsers.add_parser('search', help="answer search queries as JSON Lines")
+    search_parser.add_argument('queries', nargs='*', help="queries to search for (read from stdin when none are given)")
+    search_parser.add_argument('-f', '--file', help="read one query per line from FILE ('-' for stdin)")
+    search_parser.add_argument('--limit', type=int, default=SEARCH_LIMIT, help=f"return at most this many results per query (default {SEARCH_LIMIT}, 0 for all)")
+    search_parser.add_argument('--offset', type=int, default=0, help="skip this many results per query, for paging")
+    search_parser.add_argument('--fuzzy', action='store_true', help=f"rank titles by typo-tolerant similarity (top {FUZZY_LIMIT} when --limit is 0)")
+    codes_parser = subparsers.add_parser('codes', help="look up title IDs with their base game, updates and DLC as JSON Lines")
+    codes_parser.add_argument('codes', nargs='*', help="16-digit hex title IDs (read from stdin when none are given)")
+    codes_parser.add_argument('-f', '--file', help="read one title ID per line from FILE ('-' for stdin)")
+    links_parser = subparsers.add_parser('links', help="resolve download links for game pages as JSON Lines")
+    links_parser.add_argument('urls', nargs='*', help="game page URLs (read from stdin when none are given)")
+    links_parser.add_argument('-f', '--file', help="read one URL per line from FILE ('-' for stdin)")
+    links_parser.add_argument('--workers', type=int, default=BATCH_WORKERS, help="concurrent page fetches")
+    links_parser.add_argument('--per-host', type=int, default=BATCH_PER_HOST, help="concurrent page fetches per host")
+    links_parser.add_argument('--all', action='store_true', help="include old updates")
+    links_parser.add_argument('--refresh', action='store_true', help="ignore cached results and fetch every page again")
+    serve_parser = subparsers.add_parser('serve', help="answer search and link queries over a local JSON API")
+    serve_parser.add_argument('--host', default=SERVE_HOST, help="address to listen on")
+    serve_parser.add_argument('--port', type=int, default=SERVE_PORT, help="port to listen on")
+    serve_parser.add_argument('--socket', help="listen on this Unix socket instead of TCP")
+    serve_parser.add_argument('--reload-interval', type=float, default=SERVE_RELOAD_INTERVAL, help="seconds between catalog change checks")
+    serve_parser.add_argument('--verbose', action='store_true', help="log every request")
+    return parser
+
+COMMANDS = {
+    'update': run_update,
+    'search': run_search,
+    'codes': run_codes,
+    'links': run_links,
+    'serve': run_serve,
+}
+
+def main(args=None):
+    args = build_arg_parser().parse_args(args)
+    if args.profile:
+        enable_profiling()
+    capture = start_capture() if args.profile_capture else None
+    try:
+        if args.command is None:
+            return run_menu()
+        return COMMANDS[args.command](args)
+    finally:
+        print_profile_report()
+        if capture is not None:
+            stop_capture(capture, args.profile_capture)
+
+if __name__ == "__main__":
+    exit(main())
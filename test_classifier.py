@@ -0,0 +1,36 @@
+from json import load
+from os import path
+from unittest import TestCase, main
+
+from switch_cfw_dl import extract_regions_from_name, parse_file_info
+
+GOLDEN_FILE = path.join(path.dirname(path.abspath(__file__)), 'benchmarks', 'fixtures', 'classification_golden.json')
+
+class ClassifierGoldenTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        with open(GOLDEN_FILE, 'r', encoding='utf-8') as f:
+            cls.golden = load(f)
+
+    def test_file_info(self):
+        mismatches = [
+            (filename, actual, expected)
+            for filename, expected in self.golden['file_info']
+            for actual in [parse_file_info(filename)]
+            if actual != expected
+        ]
+        self.assertTrue(self.golden['file_info'])
+        self.assertEqual(mismatches, [])
+
+    def test_regions(self):
+        mismatches = [
+            (game_name, region_text, actual, expected)
+            for game_name, region_text, expected in self.golden['regions']
+            for actual in [extract_regions_from_name(game_name, region_text)]
+            if actual != expected
+        ]
+        self.assertTrue(self.golden['regions'])
+        self.assertEqual(mismatches, [])
+
+if __name__ == '__main__':
+    main()
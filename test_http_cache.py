@@ -0,0 +1,213 @@
+from glob import glob
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from os import path, urandom
+from tempfile import TemporaryDirectory
+from threading import Thread
+from time import time
+from unittest import TestCase, main
+
+import switch_cfw_dl
+from switch_cfw_dl import HTTPCache, HTTPSession, LinkCache, fetch_download_links
+
+LAST_MODIFIED = 'Mon, 06 Jan 2025 10:00:00 GMT'
+BLOB_SIZE = 50_000
+with open(path.join(path.dirname(path.abspath(__file__)), 'benchmarks', 'fixtures', 'detail_structured.html'), 'rb') as f:
+    DETAIL_PAGE = f.read()
+
+class CacheTestHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        self.server.requests.append((self.path, dict(self.headers)))
+        version = self.server.version
+        if self.path in ('/etag', '/game'):
+            headers = {'ETag': f'"v{version}"'}
+            not_modified = self.headers.get('If-None-Match') == headers['ETag']
+        elif self.path == '/modified':
+            headers = {'Last-Modified': LAST_MODIFIED}
+            not_modified = self.headers.get('If-Modified-Since') == LAST_MODIFIED
+        else:
+            headers = {}
+            not_modified = False
+        if not_modified:
+            self.send_response(304)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        if self.path == '/game':
+            body = DETAIL_PAGE.replace(b'</body>', f'<!-- v{version} --></body>'.encode())
+        elif self.path.startswith('/blob/'):
+            body = self.server.blobs.setdefault(self.path, urandom(BLOB_SIZE))
+        else:
+            body = f'{self.path} v{version}'.encode()
+        self.send_response(200)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+class LocalServerTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), CacheTestHandler)
+        cls.server.daemon_threads = True
+        cls.server.blobs = {}
+        Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base_url = f'http://127.0.0.1:{cls.server.server_address[1]}'
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        self.server.requests = []
+        self.server.version = 1
+        self.temp_dir = TemporaryDirectory()
+        self.cache = HTTPCache(self.temp_dir.name, ttl=3600, max_size=10 * BLOB_SIZE)
+        self.previous_session = switch_cfw_dl.http_session
+        switch_cfw_dl.http_session = HTTPSession()
+
+    def tearDown(self):
+        switch_cfw_dl.http_session.close()
+        switch_cfw_dl.http_session = self.previous_session
+        self.cache.conn.close()
+        self.temp_dir.cleanup()
+
+    def fetch(self, route, max_age=None):
+        stream, modified = self.cache.open(self.base_url + route, max_age)
+        with stream:
+            return stream.read(), modified
+
+    def expire(self, route, age=7200):
+        with self.cache.conn:
+            self.cache.conn.execute("UPDATE entries SET fetched_at = fetched_at - ? WHERE url = ?", (age, self.base_url + route))
+
+    def cached_routes(self):
+        rows = self.cache.conn.execute("SELECT url FROM entries").fetchall()
+        return sorted(url[len(self.base_url):] for url, in rows)
+
+    def temp_files(self):
+        return glob(path.join(self.temp_dir.name, '*.tmp'))
+
+class HTTPCacheTest(LocalServerTest):
+    def test_fresh_entry_is_served_from_disk(self):
+        self.assertEqual(self.fetch('/etag'), (b'/etag v1', True))
+        self.assertEqual(self.fetch('/etag'), (b'/etag v1', False))
+        self.assertEqual(len(self.server.requests), 1)
+
+    def test_ttl_expiry_revalidates(self):
+        self.fetch('/plain')
+        self.expire('/plain', 60)
+        self.assertEqual(self.fetch('/plain'), (b'/plain v1', False))
+        self.assertEqual(len(self.server.requests), 1)
+        self.expire('/plain')
+        self.server.version = 2
+        self.assertEqual(self.fetch('/plain'), (b'/plain v2', True))
+        self.assertEqual(len(self.server.requests), 2)
+
+    def test_etag_revalidation_uses_304(self):
+        self.fetch('/etag')
+        self.expire('/etag')
+        self.assertEqual(self.fetch('/etag'), (b'/etag v1', False))
+        self.assertEqual(self.server.requests[-1][1].get('If-None-Match'), '"v1"')
+        self.assertGreater(self.cache.lookup(self.base_url + '/etag')[2], time() - 60)
+        self.assertEqual(self.fetch('/etag'), (b'/etag v1', False))
+        self.assertEqual(len(self.server.requests), 2)
+
+    def test_etag_change_replaces_entry(self):
+        self.fetch('/etag')
+        self.server.version = 2
+        self.assertEqual(self.fetch('/etag', max_age=0), (b'/etag v2', True))
+        self.assertEqual(self.cache.lookup(self.base_url + '/etag')[0], '"v2"')
+
+    def test_last_modified_revalidation_uses_304(self):
+        self.fetch('/modified')
+        self.assertEqual(self.fetch('/modified', max_age=0), (b'/modified v1', False))
+        self.assertEqual(self.server.requests[-1][1].get('If-Modified-Since'), LAST_MODIFIED)
+        self.assertNotIn('If-None-Match', self.server.requests[-1][1])
+
+    def test_lru_eviction_by_size(self):
+        self.cache.max_size = 2 * BLOB_SIZE + 1000
+        self.fetch('/blob/1')
+        self.fetch('/blob/2')
+        self.fetch('/blob/1')
+        self.fetch('/blob/3')
+        self.assertEqual(self.cached_routes(), ['/blob/1', '/blob/3'])
+        self.assertFalse(path.exists(self.cache.file_path(self.base_url + '/blob/2')))
+        self.assertEqual(len(glob(path.join(self.temp_dir.name, '*.gz'))), 2)
+
+    def test_partial_read_removes_temp_file(self):
+        stream, modified = self.cache.open(self.base_url + '/blob/partial')
+        self.assertTrue(modified)
+        with stream:
+            self.assertEqual(len(stream.read(100)), 100)
+            self.assertEqual(len(self.temp_files()), 1)
+        self.assertEqual(self.temp_files(), [])
+        self.assertEqual(self.cached_routes(), [])
+        self.assertFalse(path.exists(self.cache.file_path(self.base_url + '/blob/partial')))
+
+    def test_interrupted_read_removes_temp_file(self):
+        with self.assertRaises(RuntimeError):
+            with self.cache.open(self.base_url + '/blob/interrupted')[0] as stream:
+                stream.read(BLOB_SIZE // 2)
+                raise RuntimeError("connection dropped")
+        self.assertEqual(self.temp_files(), [])
+        self.assertIsNone(self.cache.lookup(self.base_url + '/blob/interrupted'))
+
+class LinkRevalidationTest(LocalServerTest):
+    def setUp(self):
+        super().setUp()
+        self.links = LinkCache(path.join(self.temp_dir.name, 'links.db'), ttl=3600)
+        self.previous = switch_cfw_dl.http_cache, switch_cfw_dl.link_cache, switch_cfw_dl.parse_detail_page
+        self.parses = 0
+
+        def counting_parse(html):
+            self.parses += 1
+            return self.previous[2](html)
+
+        switch_cfw_dl.http_cache = self.cache
+        switch_cfw_dl.link_cache = self.links
+        switch_cfw_dl.parse_detail_page = counting_parse
+        self.game_url = self.base_url + '/game'
+
+    def tearDown(self):
+        switch_cfw_dl.http_cache, switch_cfw_dl.link_cache, switch_cfw_dl.parse_detail_page = self.previous
+        self.links.conn.close()
+        super().tearDown()
+
+    def expire_links(self, age=7200):
+        with self.links.conn:
+            self.links.conn.execute("UPDATE links SET fetched_at = fetched_at - ?", (age,))
+
+    def test_not_modified_page_skips_parse(self):
+        links = fetch_download_links(self.game_url)
+        self.assertTrue(links)
+        self.assertEqual(self.parses, 1)
+        self.expire_links()
+        self.expire('/game')
+        self.assertEqual(fetch_download_links(self.game_url), links)
+        self.assertEqual(self.server.requests[-1][1].get('If-None-Match'), '"v1"')
+        self.assertEqual((len(self.server.requests), self.parses), (2, 1))
+        self.assertGreater(self.links.conn.execute("SELECT fetched_at FROM links").fetchone()[0], time() - 60)
+        self.assertEqual(fetch_download_links(self.game_url), links)
+        self.assertEqual((len(self.server.requests), self.parses), (2, 1))
+
+    def test_fresh_page_skips_parse(self):
+        links = fetch_download_links(self.game_url)
+        self.expire_links()
+        self.assertEqual(fetch_download_links(self.game_url), links)
+        self.assertEqual((len(self.server.requests), self.parses), (1, 1))
+
+    def test_changed_page_is_parsed(self):
+        fetch_download_links(self.game_url)
+        self.server.version = 2
+        fetch_download_links(self.game_url, max_age=0)
+        self.assertEqual((len(self.server.requests), self.parses), (2, 2))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+from os import path
+from tempfile import TemporaryDirectory
+from threading import Thread
+from unittest import TestCase, main
+
+from switch_cfw_dl import FUZZY_CANDIDATES, SEARCH_LIMIT, CatalogService, fuzzy_search_games, lookup_codes, search_game_by_name, update_games_catalog
+
+TITLES = FUZZY_CANDIDATES + 100
+
+def generate_games(count):
+    for i in range(count):
+        yield {
+            'name': f"Zelda Quest {i:04d}",
+            'link': f"https://nswdl.com/{i}/",
+            'code': f"{0x0100000000010000 + (i << 13):016X}",
+            'regions': ['US'],
+        }
+
+class SearchPagingTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.temp_dir = TemporaryDirectory()
+        files = [path.join(cls.temp_dir.name, name) for name in ('games.db', 'games.bin', 'games.json', 'games_us.json')]
+        update_games_catalog(generate_games(TITLES), *files)
+        cls.service = CatalogService(*files[:3])
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.service.close()
+        cls.temp_dir.cleanup()
+
+    def names(self, results):
+        return [game['name'] for game in results]
+
+    def test_search_pages_match_unlimited_results(self):
+        everything = self.names(search_game_by_name(self.service.connection(), 'zelda', limit=0))
+        self.assertEqual(len(everything), TITLES)
+        pages = [self.names(search_game_by_name(self.service.connection(), 'zelda', 7, offset)) for offset in range(0, 21, 7)]
+        self.assertEqual(sum(pages, []), everything[:21])
+        self.assertEqual(len(search_game_by_name(self.service.connection(), 'zelda', offset=20)), SEARCH_LIMIT)
+
+    def test_fuzzy_pages_match_first_page(self):
+        first = self.names(fuzzy_search_games(self.service.connection(), 'zleda', 10))
+        self.assertEqual(len(first), 10)
+        self.assertEqual(self.names(fuzzy_search_games(self.service.connection(), 'zleda', 5, 5)), first[5:])
+        self.assertEqual(self.names(self.service.search('zleda', fuzzy=True, limit=2, offset=2)), first[2:4])
+
+    def test_fuzzy_deep_page_past_candidate_cap(self):
+        page = fuzzy_search_games(self.service.connection(), 'zleda', 50, TITLES - 50)
+        self.assertEqual(len(page), 50)
+        everything = self.names(fuzzy_search_games(self.service.connection(), 'zleda', TITLES))
+        self.assertEqual(self.names(page), everything[-50:])
+        self.assertEqual(len(set(everything)), TITLES)
+
+    def test_each_thread_reads_through_its_own_connection(self):
+        connections = []
+        worker = Thread(target=lambda: connections.append((self.service.connection(), len(self.service.search('zelda')))))
+        worker.start()
+        worker.join()
+        self.assertIsNot(connections[0][0], self.service.connection())
+        self.assertEqual(connections[0][1], SEARCH_LIMIT)
+        self.assertIs(self.service.connection(), self.service.connection())
+
+    def test_code_lookup_keeps_one_result_per_input(self):
+        code = f"{0x0100000000010000:016X}"
+        update = f"{0x0100000000010800:016X}"
+        codes = [code, code, f" {code}", update, 'nope', code]
+        results = lookup_codes(self.service.connection(), codes)
+        self.assertEqual([result['code'] for result in results], [code, code, code, update, 'nope', code])
+        self.assertEqual([len(result.get('matches', [])) for result in results], [1, 1, 1, 0, 0, 1])
+        self.assertEqual(results[3]['kind'], 'update')
+        self.assertIn('error', results[4])
+
+if __name__ == '__main__':
+    main()